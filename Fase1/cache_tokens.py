@@ -0,0 +1,304 @@
+"""
+Caché binaria de tokens, direccionada por contenido.
+
+La clave de cada entrada es el hash del fichero fuente más el hash de las
+reglas del lexer: si cambia cualquiera de los dos, la entrada deja de usarse.
+Formato de una entrada (.tok):
+
+    'TKC1' | n (uint32) | tipos: n x uint8 (relleno a 4) | offsets: n x uint32 | longitudes: n x uint32
+
+Los tipos son índices en parser.tokens (255 = error léxico). Al leerla se
+hace mmap del fichero y se crean memoryview sobre cada sección, sin copiar
+ni crear LexToken. La validación recorre los códigos con el AFD de
+dfa_rapido y solo recurre al parser LL(1) para describir los errores, que
+también lee los códigos cacheados en lugar de volver a lexear el texto.
+"""
+
+import os
+import sys
+import mmap
+import time
+import struct
+import hashlib
+import tempfile
+from array import array
+from typing import List, Optional
+
+import ply.lex as lex
+
+import parser as ll1
+from dfa_rapido import ReconocedorAFD, ESTADO_MUERTO
+
+MAGICO = b'TKC1'
+CABECERA = struct.Struct('<4sI')
+ERROR_LEXICO = 255
+CODIGO_TOKEN = {tipo: i for i, tipo in enumerate(ll1.tokens)}
+FIN_INSTRUCCION = CODIGO_TOKEN['finInstruccion']
+
+
+def hash_reglas(lexer=ll1.lexer) -> str:
+    """Hash de las reglas del lexer (expresiones maestras, ignorados y tokens)."""
+    h = hashlib.sha256()
+    h.update(repr(ll1.tokens).encode('utf-8'))
+    h.update(lexer.lexignore.encode('utf-8'))
+    for regex, indice in lexer.lexre:
+        h.update(regex.pattern.encode('utf-8'))
+        h.update(repr([None if f is None else f[1] for f in indice]).encode('utf-8'))
+    return h.hexdigest()[:16]
+
+
+def lexear_a_arrays(texto: str, lexer=None):
+    """Lexea el texto con PLY y devuelve (tipos, offsets, longitudes) como arrays."""
+    lexer = lexer or ll1.crear_lexer()
+    lexer.input(texto)
+    tipos = array('B')
+    offsets = array('I')
+    longitudes = array('I')
+    while True:
+        try:
+            tok = lexer.token()
+        except SyntaxError:
+            tipos.append(ERROR_LEXICO)
+            offsets.append(lexer.lexpos - 1)
+            longitudes.append(1)
+            continue
+        if tok is None:
+            break
+        tipos.append(CODIGO_TOKEN[tok.type])
+        offsets.append(tok.lexpos)
+        longitudes.append(lexer.lexpos - tok.lexpos)
+    return tipos, offsets, longitudes
+
+
+class TokensCacheados:
+    """Vista de solo lectura sobre una entrada de la caché (mmap + memoryview)."""
+
+    def __init__(self, ruta: str):
+        with open(ruta, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        vista = memoryview(self._mmap)
+        magico, n = CABECERA.unpack_from(vista, 0)
+        if magico != MAGICO:
+            vista.release()
+            self._mmap.close()
+            raise ValueError(f"Entrada de caché inválida: {ruta}")
+        inicio = CABECERA.size
+        relleno = (-n) % 4
+        self.n = n
+        self.tipos = vista[inicio:inicio + n]
+        inicio += n + relleno
+        self.offsets = vista[inicio:inicio + 4 * n].cast('I')
+        inicio += 4 * n
+        self.longitudes = vista[inicio:inicio + 4 * n].cast('I')
+        self._vista = vista
+
+    def __len__(self):
+        return self.n
+
+    def cerrar(self):
+        for v in (self.tipos, self.offsets, self.longitudes, self._vista):
+            v.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def escribir_entrada(ruta: str, tipos, offsets, longitudes):
+    """Escribe una entrada de forma atómica (fichero temporal + os.replace)."""
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.{os.getpid()}.tmp"
+    with open(temporal, 'wb') as f:
+        f.write(CABECERA.pack(MAGICO, len(tipos)))
+        f.write(tipos.tobytes())
+        f.write(b'\0' * ((-len(tipos)) % 4))
+        f.write(offsets.tobytes())
+        f.write(longitudes.tobytes())
+    os.replace(temporal, ruta)
+
+
+class CacheTokens:
+    """Caché de tokens en disco, con claves hash(fichero) + hash(reglas del lexer)."""
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self.reglas = hash_reglas()
+        self.aciertos = 0
+        self.fallos = 0
+
+    def _ruta(self, hash_fichero: str) -> str:
+        return os.path.join(self.directorio, hash_fichero[:2],
+                            f"{hash_fichero}-{self.reglas}.tok")
+
+    def obtener(self, contenido: bytes) -> TokensCacheados:
+        """Devuelve los tokens del contenido, lexeándolo solo si no está en caché."""
+        ruta = self._ruta(hashlib.sha256(contenido).hexdigest())
+        if os.path.exists(ruta):
+            self.aciertos += 1
+        else:
+            self.fallos += 1
+            escribir_entrada(ruta, *lexear_a_arrays(contenido.decode('utf-8')))
+        return TokensCacheados(ruta)
+
+
+# Tablas del AFD ya traducidas a los códigos de parser.tokens: se construyen
+# la primera vez que se validan tokens y se reutilizan en el resto de ficheros.
+_tablas: Optional[tuple] = None
+
+
+def _tablas_afd():
+    """Tabla plana del AFD indexada por código de parser.tokens (-1 si no está en el alfabeto)."""
+    global _tablas
+    if _tablas is None:
+        afd = ReconocedorAFD()
+        traduccion = [-1] * 256
+        for tipo, codigo in afd.codigos.items():
+            traduccion[CODIGO_TOKEN[tipo]] = codigo
+        plana = [d for fila in afd.transiciones for d in fila]
+        _tablas = (traduccion, plana, len(afd.alfabeto), afd.codigos['eof'], afd.finales)
+    return _tablas
+
+
+def validar_tokens(tokens: TokensCacheados) -> List[int]:
+    """
+    Valida todas las instrucciones a partir de los códigos de tipo.
+    Devuelve los índices (en el array de tokens) del inicio de cada
+    instrucción inválida.
+    """
+    traduccion, plana, n, eof, finales = _tablas_afd()
+    erroneas = []
+    estado = 0
+    inicio = 0
+    en_error = False
+    for i, codigo in enumerate(tokens.tipos):
+        if not en_error:
+            columna = traduccion[codigo]
+            if columna < 0:
+                en_error = True
+            else:
+                estado = plana[estado * n + columna]
+                en_error = estado == ESTADO_MUERTO
+        if codigo == FIN_INSTRUCCION:
+            if en_error or plana[estado * n + eof] not in finales:
+                erroneas.append(inicio)
+            estado = 0
+            inicio = i + 1
+            en_error = False
+    if inicio < len(tokens):
+        # Última instrucción sin ';'
+        erroneas.append(inicio)
+    return erroneas
+
+
+class _LectorCodigos:
+    """
+    Interfaz lexer.token() sobre una instrucción de la caché: crea los
+    LexToken a partir de los códigos y offsets, sin volver a lexear el texto.
+    Tras el ';' (o el último token) devuelve un token 'eof'.
+    """
+
+    def __init__(self, texto: str, tokens: TokensCacheados, inicio: int, fin: int):
+        self._texto = texto
+        self._tokens = tokens
+        self._i = inicio
+        self._fin = fin
+
+    def token(self):
+        tokens = self._tokens
+        i = self._i
+        tok = lex.LexToken()
+        tok.lineno = 0
+        if i >= self._fin:
+            ultimo = self._fin - 1
+            tok.type, tok.value = 'eof', '$'
+            tok.lexpos = tokens.offsets[ultimo] + tokens.longitudes[ultimo]
+            return tok
+        self._i = i + 1
+        desde = tokens.offsets[i]
+        if tokens.tipos[i] == ERROR_LEXICO:
+            raise SyntaxError(f"Error Léxico: Carácter inesperado '{self._texto[desde]}'")
+        tok.type = ll1.tokens[tokens.tipos[i]]
+        tok.value = self._texto[desde:desde + tokens.longitudes[i]]
+        tok.lexpos = desde
+        return tok
+
+
+def describir_error(texto: str, tokens: TokensCacheados, inicio: int) -> str:
+    """
+    Ejecuta el parser LL(1) sobre los tokens cacheados de la instrucción
+    para obtener el mensaje de error.
+    """
+    fin = inicio
+    while fin < len(tokens) and tokens.tipos[fin] != FIN_INSTRUCCION:
+        fin += 1
+    fin = min(fin + 1, len(tokens))
+    linea = texto.count('\n', 0, tokens.offsets[inicio]) + 1
+    ll1.stack = ['eof', ll1.S]
+    try:
+        ll1.miParser(_LectorCodigos(texto, tokens, inicio, fin))
+        return f"Línea {linea}: instrucción inválida"
+    except (SyntaxError, SystemError) as e:
+        return f"Línea {linea}: {e}"
+
+
+def validar_fichero(ruta: str, cache: CacheTokens) -> List[str]:
+    """Valida un fichero usando la caché. Devuelve los mensajes de error."""
+    with open(ruta, 'rb') as f:
+        contenido = f.read()
+    with cache.obtener(contenido) as tokens:
+        erroneas = validar_tokens(tokens)
+        if not erroneas:
+            return []
+        texto = contenido.decode('utf-8')
+        return [describir_error(texto, tokens, i) for i in erroneas]
+
+
+def validar_arbol(directorio: str, cache: CacheTokens, extension: str = '.c'):
+    """Valida todos los ficheros del árbol. Devuelve {ruta: [errores]} de los inválidos."""
+    resultado = {}
+    for raiz, _, ficheros in os.walk(directorio):
+        for nombre in sorted(ficheros):
+            if nombre.endswith(extension):
+                ruta = os.path.join(raiz, nombre)
+                errores = validar_fichero(ruta, cache)
+                if errores:
+                    resultado[ruta] = errores
+    return resultado
+
+
+# Benchmark: validación en frío (sin caché) y en caliente
+
+def main(argv):
+    n_ficheros = int(argv[1]) if len(argv) > 1 else 200
+    lineas_por_fichero = int(argv[2]) if len(argv) > 2 else 2_000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fuentes = os.path.join(tmp, "src")
+        for f in range(n_ficheros):
+            carpeta = os.path.join(fuentes, f"modulo{f % 10}")
+            os.makedirs(carpeta, exist_ok=True)
+            with open(os.path.join(carpeta, f"fichero{f}.c"), "w", encoding="utf-8") as salida:
+                for i in range(lineas_por_fichero):
+                    if f % 50 == 0 and i == lineas_por_fichero // 2:
+                        salida.write(f"int contador{i} = 10 ;\n")    # error de sintaxis
+                    else:
+                        salida.write(f"float precio{f}_{i}, impuesto{i}, total{i} ; // linea {i}\n")
+
+        for pasada in ("frío", "caliente"):
+            cache = CacheTokens(os.path.join(tmp, "cache"))
+            inicio = time.perf_counter()
+            invalidos = validar_arbol(fuentes, cache)
+            t = time.perf_counter() - inicio
+            print(f"Validación en {pasada:8}: {n_ficheros} ficheros x {lineas_por_fichero} líneas "
+                  f"en {t:.2f} s | aciertos de caché: {cache.aciertos}, fallos: {cache.fallos} | "
+                  f"ficheros con errores: {len(invalidos)}")
+        if invalidos:
+            ruta, errores = next(iter(invalidos.items()))
+            print(f"Ejemplo: {os.path.relpath(ruta, fuentes)}: {errores[0]}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
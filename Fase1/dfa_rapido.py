@@ -0,0 +1,346 @@
+"""
+Reconocedor rápido (AFD) compilado desde la gramática LL(1) de parser.py.
+
+La gramática S/TT/D describe un lenguaje regular: no hay auto-incrustación
+(ningún No-Terminal A deriva a α A β con α y β no vacíos). Para esas
+gramáticas se puede construir un autómata finito:
+
+  1. tabla LL(1)  ->  producciones por No-Terminal
+  2. comprobar que la gramática no es auto-incrustada
+  3. producciones ->  AFN (la recursión en posición final es un arco vacío)
+  4. AFN -> AFD (construcción de subconjuntos) -> AFD mínimo (Moore)
+
+El AFD trabaja sobre códigos enteros de tipo de token. Para no crear
+LexToken se recorre el texto con las mismas expresiones maestras que
+construye PLY (lexer.lexre), así que la tokenización es idéntica.
+
+validar() usa el AFD como pre-filtro: si acepta, la cadena es válida;
+si rechaza, se ejecuta el parser LL(1) completo para obtener el error.
+"""
+
+import io
+import sys
+import time
+import contextlib
+from typing import Dict, List, Optional
+
+import parser as ll1
+
+# Tipos que PLY reconoce pero descarta (sus funciones no devuelven token)
+DESCARTADOS = {'newline', 'comentario', 'comentario_bloque'}
+
+ESTADO_MUERTO = -1
+
+
+class GramaticaNoRegular(ValueError):
+    """La gramática es auto-incrustada: no existe un AFD equivalente."""
+
+
+def gramatica_desde_tabla(tabla) -> Dict[str, List[list]]:
+    """Extrae las producciones distintas de cada No-Terminal de la tabla LL(1)."""
+    producciones: Dict[str, List[list]] = {}
+    for nt, _, produccion in tabla:
+        lista = producciones.setdefault(nt, [])
+        if produccion is not None and produccion not in lista:
+            lista.append(produccion)
+    return producciones
+
+
+def _simbolos(produccion):
+    return [s for s in produccion if s != 'vacia']
+
+
+def es_auto_incrustada(producciones) -> bool:
+    """
+    Busca un No-Terminal A con A =>* α A β, α y β no vacíos.
+    Se recorren estados (No-Terminal, hay_izquierda, hay_derecha).
+    (Se considera que ningún símbolo deriva la cadena vacía: es conservador.)
+    """
+    for inicio in producciones:
+        vistos = set()
+        pendientes = [(inicio, False, False)]
+        while pendientes:
+            estado = pendientes.pop()
+            if estado in vistos:
+                continue
+            vistos.add(estado)
+            nt, izq, der = estado
+            for produccion in producciones[nt]:
+                simbolos = _simbolos(produccion)
+                for i, s in enumerate(simbolos):
+                    if s not in producciones:
+                        continue
+                    nuevo = (s, izq or i > 0, der or i < len(simbolos) - 1)
+                    if nuevo == (inicio, True, True):
+                        return True
+                    pendientes.append(nuevo)
+    return False
+
+
+class _AFN:
+    """Autómata finito no determinista: arcos (símbolo o None) por estado."""
+
+    def __init__(self):
+        self.arcos: List[List[tuple]] = []
+
+    def nuevo_estado(self) -> int:
+        self.arcos.append([])
+        return len(self.arcos) - 1
+
+    def arco(self, origen, simbolo, destino):
+        self.arcos[origen].append((simbolo, destino))
+
+
+def construir_afn(producciones, inicial, fin_entrada='eof'):
+    """
+    Construye el AFN de 'inicial' seguido del terminal de fin de entrada.
+    Devuelve (afn, estado_inicial, estado_final).
+    La recursión solo se admite en posición final (gramáticas lineales por
+    la derecha tras expandir los No-Terminales no recursivos).
+    """
+    afn = _AFN()
+    en_curso = set()
+
+    def construir(nt, inicio, fin, cola):
+        en_curso.add(nt)
+        for produccion in producciones[nt]:
+            simbolos = _simbolos(produccion)
+            if not simbolos:
+                afn.arco(inicio, None, fin)
+                continue
+            actual = inicio
+            for i, s in enumerate(simbolos):
+                ultimo = i == len(simbolos) - 1
+                destino = fin if ultimo else afn.nuevo_estado()
+                if s not in producciones:
+                    afn.arco(actual, s, destino)
+                elif ultimo and s in cola:
+                    # Recursión final: volver al inicio de ese No-Terminal
+                    afn.arco(actual, None, cola[s])
+                elif s in en_curso:
+                    raise GramaticaNoRegular(
+                        f"Recursión de '{s}' fuera de posición final: no soportada por el compilador de AFD")
+                else:
+                    sub_inicio = afn.nuevo_estado()
+                    afn.arco(actual, None, sub_inicio)
+                    nueva_cola = dict(cola) if ultimo else {}
+                    nueva_cola[s] = sub_inicio
+                    construir(s, sub_inicio, destino, nueva_cola)
+                actual = destino
+        en_curso.discard(nt)
+
+    q0 = afn.nuevo_estado()
+    q_medio = afn.nuevo_estado()
+    q_final = afn.nuevo_estado()
+    construir(inicial, q0, q_medio, {inicial: q0})
+    afn.arco(q_medio, fin_entrada, q_final)
+    return afn, q0, q_final
+
+
+def _clausura(afn, estados):
+    pila = list(estados)
+    resultado = set(estados)
+    while pila:
+        q = pila.pop()
+        for simbolo, destino in afn.arcos[q]:
+            if simbolo is None and destino not in resultado:
+                resultado.add(destino)
+                pila.append(destino)
+    return frozenset(resultado)
+
+
+def determinizar(afn, q0, q_final, alfabeto):
+    """Construcción de subconjuntos. Devuelve (transiciones, finales) del AFD."""
+    inicial = _clausura(afn, [q0])
+    indices = {inicial: 0}
+    pendientes = [inicial]
+    transiciones = []
+    finales = set()
+    while pendientes:
+        conjunto = pendientes.pop(0)
+        fila = [ESTADO_MUERTO] * len(alfabeto)
+        for codigo, simbolo in enumerate(alfabeto):
+            destinos = [d for q in conjunto for s, d in afn.arcos[q] if s == simbolo]
+            if not destinos:
+                continue
+            siguiente = _clausura(afn, destinos)
+            if siguiente not in indices:
+                indices[siguiente] = len(indices)
+                pendientes.append(siguiente)
+            fila[codigo] = indices[siguiente]
+        transiciones.append(fila)
+        if q_final in conjunto:
+            finales.add(indices[conjunto])
+    return transiciones, finales
+
+
+def minimizar(transiciones, finales):
+    """
+    Minimización de Moore: refina la partición {finales, no finales}
+    hasta que los estados de cada clase tengan transiciones equivalentes.
+    """
+    n = len(transiciones)
+    clase = [1 if q in finales else 0 for q in range(n)]
+    while True:
+        firmas = {}
+        nueva = []
+        for q in range(n):
+            firma = (clase[q],) + tuple(
+                clase[d] if d != ESTADO_MUERTO else ESTADO_MUERTO for d in transiciones[q])
+            nueva.append(firmas.setdefault(firma, len(firmas)))
+        if len(firmas) == len(set(clase)):
+            break
+        clase = nueva
+
+    # Renumerar para que el estado inicial (0) siga siendo el 0
+    orden = {}
+    for q in range(n):
+        orden.setdefault(clase[q], len(orden))
+    minimas = [None] * len(orden)
+    for q in range(n):
+        c = orden[clase[q]]
+        if minimas[c] is None:
+            minimas[c] = [orden[clase[d]] if d != ESTADO_MUERTO else ESTADO_MUERTO
+                          for d in transiciones[q]]
+    return minimas, {orden[clase[q]] for q in finales}
+
+
+class ReconocedorAFD:
+    """AFD mínimo sobre códigos de tipo de token, compilado desde la tabla LL(1)."""
+
+    def __init__(self, tabla=ll1.tabla, inicial=ll1.S, lexer=ll1.lexer):
+        producciones = gramatica_desde_tabla(tabla)
+        if es_auto_incrustada(producciones):
+            raise GramaticaNoRegular("La gramática es auto-incrustada: no es regular")
+
+        afn, q0, q_final = construir_afn(producciones, inicial)
+        self.alfabeto = sorted({s for arcos in afn.arcos for s, _ in arcos if s is not None})
+        self.codigos = {simbolo: i for i, simbolo in enumerate(self.alfabeto)}
+        transiciones, finales = determinizar(afn, q0, q_final, self.alfabeto)
+        self.transiciones, self.finales = minimizar(transiciones, finales)
+
+        # Tabla plana estado * n_simbolos + codigo: un solo acceso por paso
+        n = len(self.alfabeto)
+        self._plana = [d for fila in self.transiciones for d in fila]
+        self._n = n
+
+        # Expresiones maestras de PLY: lista de (regex, índice -> (función, tipo))
+        self._lexre = [(regex.match, [None if f is None else f[1] for f in indice])
+                       for regex, indice in lexer.lexre]
+        self._ignorar = lexer.lexignore
+
+    def acepta_tipos(self, tipos) -> bool:
+        """Acepta/rechaza una secuencia de tipos de token (incluido el 'eof' final)."""
+        estado = 0
+        codigos = self.codigos
+        plana = self._plana
+        n = self._n
+        for tipo in tipos:
+            codigo = codigos.get(tipo)
+            if codigo is None:
+                return False
+            estado = plana[estado * n + codigo]
+            if estado == ESTADO_MUERTO:
+                return False
+        return estado in self.finales
+
+    def acepta(self, texto: str) -> bool:
+        """
+        Pre-filtro sobre el texto: tokeniza con las regex de PLY sin crear
+        LexToken y avanza el AFD en el mismo bucle.
+        """
+        if not texto.strip().endswith('$'):
+            texto += ' $'
+        estado = 0
+        codigos = self.codigos
+        plana = self._plana
+        n = self._n
+        ignorar = self._ignorar
+        lexre = self._lexre
+        pos = 0
+        longitud = len(texto)
+        while pos < longitud:
+            if texto[pos] in ignorar:
+                pos += 1
+                continue
+            for match, tipos in lexre:
+                m = match(texto, pos)
+                if m:
+                    break
+            else:
+                # Carácter ilegal: que el parser completo informe del error
+                return False
+            pos = m.end()
+            tipo = tipos[m.lastindex]
+            if tipo in DESCARTADOS:
+                continue
+            codigo = codigos.get(tipo)
+            if codigo is None:
+                return False
+            estado = plana[estado * n + codigo]
+            if estado == ESTADO_MUERTO:
+                return False
+        return estado in self.finales
+
+
+_reconocedor: Optional[ReconocedorAFD] = None
+
+
+def validar(texto: str) -> bool:
+    """
+    Valida una cadena: camino rápido con el AFD y, si rechaza, el parser
+    LL(1) completo (que lanza SyntaxError con el detalle del error).
+    """
+    global _reconocedor
+    if _reconocedor is None:
+        _reconocedor = ReconocedorAFD()
+    if _reconocedor.acepta(texto):
+        return True
+    return ll1.parse_string(texto)
+
+
+# Benchmark: aceptación/rechazo de millones de líneas
+
+def _generar_lineas(n):
+    plantillas = [
+        "int x{i} ;",
+        "float precio{i}, impuesto{i}, total{i} ;",
+        "int a{i}, b{i}, c{i}, d{i}, e{i}, f{i} ;",
+        "int contador{i} = 10 ;",
+        "float a{i}, ;",
+        "char c{i} ;",
+    ]
+    return [plantillas[i % len(plantillas)].format(i=i) for i in range(n)]
+
+
+def main(argv: List[str]):
+    n = int(argv[1]) if len(argv) > 1 else 1_000_000
+    n_ll1 = min(n, 100_000)
+    lineas = _generar_lineas(n)
+    afd = ReconocedorAFD()
+    print(f"AFD mínimo: {len(afd.transiciones)} estados sobre {len(afd.alfabeto)} símbolos {afd.alfabeto}")
+
+    inicio = time.perf_counter()
+    aceptadas = sum(1 for linea in lineas if afd.acepta(linea))
+    t_afd = time.perf_counter() - inicio
+    print(f"AFD:   {n} líneas en {t_afd:.2f} s ({n / t_afd:,.0f} líneas/s), aceptadas: {aceptadas}")
+
+    # El parser LL(1) imprime avisos en errores léxicos: se descartan
+    coinciden = 0
+    inicio = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for linea in lineas[:n_ll1]:
+            try:
+                ll1.parse_string(linea)
+                ok = True
+            except (SyntaxError, SystemError):
+                ok = False
+            coinciden += ok == afd.acepta(linea)
+    t_ll1 = time.perf_counter() - inicio
+    print(f"LL(1): {n_ll1} líneas en {t_ll1:.2f} s ({n_ll1 / t_ll1:,.0f} líneas/s)")
+    print(f"Aceleración: x{(n / t_afd) / (n_ll1 / t_ll1):.1f} | "
+          f"AFD y LL(1) coinciden en {coinciden}/{n_ll1} líneas")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -3,8 +3,44 @@ import sys
 # Su función split() es mucho más robusta que line.split() porque
 # maneja correctamente las comillas y los espacios, como un shell de Unix.
 import shlex
+import re
+import time
 import spacy
-from typing import List, Optional
+from typing import Iterator, List, Optional, TextIO
+
+# Fin de oración aproximado para el pre-divisor de textos largos
+SENTENCE_END = re.compile(r'[.!?…]["\')»]*\s+')
+
+def split_text(text: str, max_chars: int) -> Iterator[tuple]:
+    """
+    Pre-divisor barato: genera (offset, fragmento) de como mucho max_chars.
+    Corta en un salto de párrafo si puede, si no en un fin de oración,
+    si no en un espacio y, como último recurso, en max_chars.
+    Los fragmentos cubren todo el texto: offset + posición local = posición global.
+    (También lo usa Fase2/spacy_nlp_parser.py para su modo documento.)
+    """
+    pos = 0
+    n = len(text)
+    while pos < n:
+        limit = pos + max_chars
+        if limit >= n:
+            yield pos, text[pos:]
+            return
+        cut = text.rfind('\n\n', pos, limit)
+        if cut > pos:
+            cut += 2
+        else:
+            last = None
+            for m in SENTENCE_END.finditer(text, pos, limit):
+                last = m
+            if last:
+                cut = last.end()
+            else:
+                cut = max(text.rfind(' ', pos, limit), text.rfind('\n', pos, limit)) + 1
+                if cut <= pos:
+                    cut = limit
+        yield pos, text[pos:cut]
+        pos = cut
 
 class NLPDemo:
     """
@@ -28,6 +64,11 @@ Modelos (Small - rápidos, menos precisos):
 Modelos (Medium - más lentos, más precisos):
   :model es_md      modelo Español (es_core_news_md)
   :model en_md      modelo Inglés (en_core_web_md)
+
+Modo por lotes (no interactivo):
+  python nlp_demo_spacy.py --input FICHERO [--n-process N] [--batch-size N] [--brief]
+  python nlp_demo_spacy.py --input - ...   (lee las líneas desde stdin)
+  python nlp_demo_spacy.py --doc FICHERO    (documento largo, por fragmentos)
 '''
 
     MODELS = {
@@ -44,6 +85,14 @@ Modelos (Medium - más lentos, más precisos):
         'def', 'class', 'import', 'elif', 'print'
     }
 
+    # Valores por defecto del modo por lotes (--input)
+    DEFAULT_N_PROCESS = 1
+    DEFAULT_BATCH_SIZE = 64
+
+    # Modo documento: tamaño máximo de fragmento (caracteres) y fragmentos por lote
+    MAX_CHUNK_CHARS = 20_000
+    DOC_BATCH_SIZE = 4
+
     # --- Métodos de Instancia ---
     
     def __init__(self):
@@ -96,14 +145,13 @@ Modelos (Medium - más lentos, más precisos):
             return False
 
     def _looks_like_code(self, text: str) -> bool:
-        """Heurística simple para detectar si el texto parece código."""
-        words = set(text.split())
-        for hint in self.CODE_HINTS:
-            if hint in text: 
-                return True
-            if hint in words: 
-                return True
-        return False
+        """
+        Heurística simple para detectar si el texto parece código.
+        Basta buscar cada pista como subcadena (una palabra igual a la pista
+        también la contiene), así no se copia el texto: en el modo documento
+        la memoria no crece con el tamaño de la entrada.
+        """
+        return any(hint in text for hint in self.CODE_HINTS)
 
     def analyze_text(self, text: str):
         """
@@ -113,7 +161,55 @@ Modelos (Medium - más lentos, más precisos):
             print("[Error] No hay un modelo spaCy cargado.")
             return
 
+        if len(text) > self.MAX_CHUNK_CHARS:
+            # Textos largos: por fragmentos para no superar nlp.max_length
+            self.analyze_document(text)
+            return
+
         doc = self.nlp(text)
+        self._print_doc(text, doc)
+
+    def analyze_document(self, text: str):
+        """
+        Modo documento: pasa los fragmentos por nlp.pipe() en lotes de
+        DOC_BATCH_SIZE y muestra tokens, frases nominales y entidades con su
+        posición [inicio:fin] en el texto completo. No se guardan los Doc,
+        así que la memoria no crece con el tamaño del documento.
+        """
+        if not self.nlp:
+            print("[Error] No hay un modelo spaCy cargado.")
+            return
+
+        print(f"\n== spaCy documento (modelo: {self.model_name}) ==")
+        print(f"Entrada: {len(text)} caracteres\n")
+        chunks = ((fragment, offset) for offset, fragment in split_text(text, self.MAX_CHUNK_CHARS))
+        n_chunks = 0
+        n_tokens = 0
+        for doc, offset in self.nlp.pipe(chunks, as_tuples=True, batch_size=self.DOC_BATCH_SIZE):
+            n_chunks += 1
+            n_tokens += len(doc)
+            if not self.brief_output:
+                for t in doc:
+                    start = offset + t.idx
+                    print(f" - [{start}:{start + len(t)}] {t.text:15} | {t.lemma_:15} | {t.pos_:6} | {t.dep_:12} | {t.head.text}")
+            try:
+                for ch in doc.noun_chunks:
+                    print(f" - Frase nominal [{offset + ch.start_char}:{offset + ch.end_char}] {ch.text}")
+            except ValueError:
+                # El modelo no tiene parser de dependencias
+                pass
+            for ent in doc.ents:
+                print(f" - Entidad [{offset + ent.start_char}:{offset + ent.end_char}] {ent.text:25} | {ent.label_}")
+
+        print(f"\n[OK] {n_chunks} fragmentos, {n_tokens} tokens")
+        self._print_observations(text)
+
+    def _print_doc(self, text: str, doc):
+        """
+        Imprime el análisis de un Doc ya procesado por spaCy.
+        Se separa de analyze_text para que el modo por lotes pueda
+        reutilizarlo con los Doc que devuelve nlp.pipe().
+        """
         print(f"\n== spaCy (modelo: {self.model_name}) ==")
         print(f"Entrada: {text}\n")
 
@@ -139,6 +235,10 @@ Modelos (Medium - más lentos, más precisos):
         else:
             print(" - (no se encontraron entidades)")
 
+        self._print_observations(text)
+
+    def _print_observations(self, text: str):
+        """Sección final de heurísticas, común al análisis normal y al modo documento."""
         print("\n4) Observaciones (Heurística):")
         # Llama al método de la instancia
         if self._looks_like_code(text):
@@ -195,6 +295,107 @@ Modelos (Medium - más lentos, más precisos):
                 except Exception as e:
                     print(f"[Error inesperado] {e}")
 
+    @classmethod
+    def _iter_lines(cls, stream: TextIO) -> Iterator[tuple]:
+        """
+        Genera (fragmento, (n_línea, offset)) para las líneas no vacías del
+        flujo de entrada, una a una. Las líneas más largas que MAX_CHUNK_CHARS
+        se trocean con split_text (offset > 0 o varios trozos por línea).
+        Al ser un generador, nlp.pipe() solo consume las líneas que puede
+        procesar: el fichero nunca se carga entero en memoria.
+        """
+        for n_line, line in enumerate(stream, 1):
+            line = line.strip()
+            if not line:
+                continue
+            if len(line) <= cls.MAX_CHUNK_CHARS:
+                yield line, (n_line, None)
+            else:
+                for offset, fragment in split_text(line, cls.MAX_CHUNK_CHARS):
+                    yield fragment, (n_line, offset)
+
+    def run_batch(self, source: str, n_process: int = DEFAULT_N_PROCESS,
+                  batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Analiza todas las líneas de un fichero (o de stdin si source es '-')
+        pasando el flujo por nlp.pipe(). spaCy conserva el orden de entrada
+        y, con n_process > 1, reparte los lotes entre varios procesos
+        alimentándolos a medida que se consumen los resultados
+        (contrapresión), así la memoria queda acotada por batch_size.
+        Las líneas demasiado largas se analizan por fragmentos.
+        """
+        if not self.nlp:
+            print("[Error] No hay un modelo spaCy cargado.")
+            return
+
+        try:
+            stream = sys.stdin if source == "-" else open(source, encoding="utf-8")
+        except OSError as e:
+            print(f"[Error] No se pudo abrir '{source}': {e}")
+            return
+
+        processed = 0
+        n_chars = 0
+        start = time.perf_counter()
+        try:
+            docs = self.nlp.pipe(self._iter_lines(stream), as_tuples=True,
+                                 n_process=n_process, batch_size=batch_size)
+            for doc, (n_line, offset) in docs:
+                if offset is not None:
+                    print(f"\n-- Línea {n_line} (fragmento desde el carácter {offset}) --")
+                self._print_doc(doc.text, doc)
+                processed += offset is None or offset == 0
+                n_chars += len(doc.text)
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        elapsed = time.perf_counter() - start
+
+        # Informe final de progreso / rendimiento
+        rate = processed / elapsed if elapsed > 0 else 0.0
+        print("\n== Resumen del lote ==")
+        print(f" - Entrada: {'stdin' if source == '-' else source}")
+        print(f" - Modelo: {self.model_name} | procesos: {n_process} | batch_size: {batch_size}")
+        print(f" - Líneas procesadas: {processed} ({n_chars} caracteres)")
+        print(f" - Tiempo total: {elapsed:.2f} s | {rate:.1f} líneas/s")
+
+    @classmethod
+    def _parse_batch_args(cls, args: List[str]) -> Optional[dict]:
+        """
+        Interpreta las opciones del modo por lotes:
+          --input FICHERO  --n-process N  --batch-size N  --brief
+        Devuelve un dict con las opciones o None si son inválidas.
+        """
+        opts = {"source": None, "n_process": cls.DEFAULT_N_PROCESS,
+                "batch_size": cls.DEFAULT_BATCH_SIZE, "brief": False}
+        i = 0
+        try:
+            while i < len(args):
+                arg = args[i]
+                if arg == "--input":
+                    opts["source"] = args[i + 1]
+                    i += 2
+                elif arg == "--n-process":
+                    opts["n_process"] = int(args[i + 1])
+                    i += 2
+                elif arg == "--batch-size":
+                    opts["batch_size"] = int(args[i + 1])
+                    i += 2
+                elif arg == "--brief":
+                    opts["brief"] = True
+                    i += 1
+                else:
+                    print(f"Opción desconocida: {arg}")
+                    return None
+        except (IndexError, ValueError):
+            print(f"Valor inválido o ausente para la opción '{args[i]}'")
+            return None
+
+        if opts["source"] is None or opts["n_process"] < 1 or opts["batch_size"] < 1:
+            print("Uso: python nlp_demo_spacy.py --input FICHERO [--n-process N] [--batch-size N] [--brief]")
+            return None
+        return opts
+
     def run_app(self, argv: List[str]):
         """
         Lógica principal de la aplicación: carga modelos y decide
@@ -211,12 +412,27 @@ Modelos (Medium - más lentos, más precisos):
         # 2. Decidir modo de operación
         if len(argv) >= 2 and argv[1] == "--repl":
             self.run_repl()
+        elif len(argv) >= 3 and argv[1] == "--doc":
+            try:
+                with open(argv[2], encoding="utf-8") as f:
+                    text = f.read()
+            except OSError as e:
+                print(f"[Error] No se pudo abrir '{argv[2]}': {e}")
+                return
+            self.analyze_document(text)
+        elif "--input" in argv[1:]:
+            opts = self._parse_batch_args(argv[1:])
+            if opts is None:
+                return
+            self.brief_output = opts["brief"]
+            self.run_batch(opts["source"], opts["n_process"], opts["batch_size"])
         elif len(argv) >= 2:
             text_to_analyze = " ".join(argv[1:])
             self.analyze_text(text_to_analyze)
         else:
             print(self.BANNER)
             print("\nPara iniciar, ejecuta: python nlp_demo_spacy.py --repl")
+            print("O procesa un fichero: python nlp_demo_spacy.py --input FICHERO")
 
 # --- Punto de entrada del script ---
 
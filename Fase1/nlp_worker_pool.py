@@ -0,0 +1,408 @@
+import sys
+import os
+import gc
+import time
+# multiprocessing permite elegir el "contexto" de arranque de los procesos:
+#  - 'fork':  el hijo es una copia del padre (comparte memoria copy-on-write)
+#  - 'spawn': el hijo arranca un intérprete nuevo y vacío
+import multiprocessing as mp
+import multiprocessing.connection
+import spacy
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from nlp_demo_spacy import NLPDemo
+
+# Modelos cargados en el proceso padre ANTES de hacer fork.
+# Los workers los heredan tal cual: las páginas de memoria con los pesos
+# se comparten copy-on-write mientras nadie las modifique.
+_MODELOS: Dict[str, spacy.Language] = {}
+
+
+def _cargar_modelos(model_keys: List[str]):
+    """Carga (una sola vez por proceso) los modelos pedidos en _MODELOS."""
+    for key in model_keys:
+        if key not in _MODELOS:
+            _MODELOS[key] = spacy.load(NLPDemo.MODELS[key])
+
+
+def _resumir_doc(doc) -> dict:
+    """
+    Convierte un Doc en un dict sencillo que se puede enviar por la cola
+    (los Doc completos son pesados de serializar entre procesos).
+    """
+    try:
+        chunks = [ch.text for ch in doc.noun_chunks]
+    except ValueError:
+        # El modelo no tiene parser de dependencias
+        chunks = []
+    return {
+        "texto": doc.text,
+        "tokens": [(t.text, t.pos_, t.dep_) for t in doc],
+        "entidades": [(ent.text, ent.label_) for ent in doc.ents],
+        "noun_chunks": chunks,
+    }
+
+
+def _worker(model_keys: List[str], conexion):
+    """
+    Bucle principal de cada worker: recibe tareas y devuelve resultados por
+    su propia conexión (Pipe) con el padre.
+    Con 'fork' los modelos ya están en _MODELOS (heredados del padre);
+    con 'spawn' cada worker tiene que cargarlos por su cuenta.
+    """
+    try:
+        _cargar_modelos(model_keys)
+    except Exception as e:
+        # Avisar al padre en lugar de dejarlo esperando
+        conexion.send(("error", os.getpid(), str(e)))
+        return
+    conexion.send(("listo", os.getpid(), None))
+
+    while True:
+        try:
+            tarea = conexion.recv()
+        except EOFError:
+            # El padre cerró la conexión
+            break
+        if tarea is None:
+            # Señal de parada
+            break
+        idx, model_key, texto = tarea
+        try:
+            resumen = _resumir_doc(_MODELOS[model_key](texto))
+        except Exception as e:
+            resumen = {"texto": texto, "error": str(e)}
+        conexion.send((idx, os.getpid(), resumen))
+
+
+class _Worker:
+    """Un proceso worker, su conexión y las tareas que tiene pendientes."""
+
+    def __init__(self, proceso, conexion):
+        self.proceso = proceso
+        self.conexion = conexion
+        self.en_vuelo: Dict[int, str] = {}   # idx -> texto, en orden de envío
+        self.desde = time.monotonic()        # inicio de la tarea en curso
+
+
+def leer_memoria(pid: int) -> Optional[Tuple[int, int]]:
+    """
+    Devuelve (RSS, PSS) en kB de un proceso leyendo /proc/<pid>/smaps_rollup.
+    PSS reparte las páginas compartidas entre los procesos que las usan,
+    así que es la medida correcta para ver el ahorro del copy-on-write.
+    Solo disponible en Linux: en otros sistemas devuelve None.
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            valores = {}
+            for linea in f:
+                partes = linea.split()
+                if len(partes) >= 2 and partes[0] in ("Rss:", "Pss:"):
+                    valores[partes[0]] = int(partes[1])
+        return valores["Rss:"], valores["Pss:"]
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class PoolPrecargado:
+    """
+    Pool de workers para analizar textos con spaCy.
+
+    Con precargar=True (por defecto) el padre carga los modelos una vez,
+    llama a gc.freeze() y hace fork de los workers, que comparten los pesos
+    del modelo copy-on-write. Con precargar=False cada worker se arranca con
+    'spawn' y carga su propia copia (sirve de referencia para comparar).
+
+    Cada worker tiene su propia conexión (Pipe), así el padre sabe qué tareas
+    tiene cada uno. Si un worker muere (OOM, fallo en el código C de spaCy)
+    o no responde en 'timeout' segundos, se termina, se arranca otro en su
+    lugar y se le reenvían sus tareas pendientes. Una tarea que ya ha pasado
+    por MAX_REINTENTOS workers caídos se da por fallida (resultado con
+    "error") para que un texto que tumba al modelo no bloquee el lote.
+    """
+
+    MAX_REINTENTOS = 2
+
+    def __init__(self, model_keys: List[str], n_workers: int = 2, precargar: bool = True,
+                 timeout: float = 120.0):
+        for key in model_keys:
+            if key not in NLPDemo.MODELS:
+                raise ValueError(f"Clave de modelo '{key}' no válida.")
+        self.model_keys = model_keys
+        self.n_workers = n_workers
+        self.precargar = precargar
+        self.timeout = timeout
+        self.tiempo_arranque: Optional[float] = None
+        self.reinicios = 0
+        self._workers: List[_Worker] = []
+        self._ctx = None
+
+    @property
+    def procesos(self) -> List[mp.Process]:
+        return [w.proceso for w in self._workers]
+
+    def _arrancar_workers(self, n: int) -> List[_Worker]:
+        """
+        Arranca n workers y espera (como mucho self.timeout) a que confirmen
+        que están listos. Lanza OSError si alguno falla, muere o no responde.
+        """
+        nuevos = []
+        for _ in range(n):
+            padre, hijo = self._ctx.Pipe()
+            p = self._ctx.Process(target=_worker, args=(self.model_keys, hijo), daemon=True)
+            p.start()
+            hijo.close()
+            nuevos.append(_Worker(p, padre))
+
+        limite = time.monotonic() + self.timeout
+        pendientes = list(nuevos)
+        errores = []
+        while pendientes:
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                errores.append(f"{len(pendientes)} worker(s) sin responder en {self.timeout:.0f} s")
+                break
+            esperas = [w.conexion for w in pendientes] + [w.proceso.sentinel for w in pendientes]
+            mp.connection.wait(esperas, timeout=restante)
+            for w in list(pendientes):
+                try:
+                    if not w.conexion.poll():
+                        if not w.proceso.is_alive():
+                            raise EOFError
+                        continue
+                    estado, pid, detalle = w.conexion.recv()
+                except (EOFError, OSError):
+                    w.proceso.join(1)
+                    errores.append(f"worker {w.proceso.pid} terminó al arrancar "
+                                   f"(exitcode {w.proceso.exitcode})")
+                    pendientes.remove(w)
+                    continue
+                if estado == "error":
+                    errores.append(f"worker {pid}: {detalle}")
+                pendientes.remove(w)
+
+        if errores:
+            for w in nuevos:
+                self._terminar(w)
+            raise OSError("No se pudieron arrancar los workers: " + "; ".join(errores))
+        return nuevos
+
+    @staticmethod
+    def _terminar(w: _Worker):
+        """Termina un worker (si sigue vivo) y cierra su conexión."""
+        if w.proceso.is_alive():
+            w.proceso.kill()
+        w.proceso.join()
+        w.conexion.close()
+
+    def iniciar(self):
+        """Arranca los workers y espera a que todos estén listos."""
+        inicio = time.perf_counter()
+
+        if self.precargar:
+            _cargar_modelos(self.model_keys)
+            # Mueve todos los objetos vivos a la generación permanente del GC:
+            # así el recolector no toca sus cabeceras en los hijos y no
+            # provoca copias de páginas que deberían seguir compartidas.
+            gc.freeze()
+            self._ctx = mp.get_context("fork")
+        else:
+            self._ctx = mp.get_context("spawn")
+
+        try:
+            self._workers = self._arrancar_workers(self.n_workers)
+        except OSError:
+            if self.precargar:
+                gc.unfreeze()
+            raise
+        self.tiempo_arranque = time.perf_counter() - inicio
+
+    def _reemplazar(self, w: _Worker, reintentar: deque, resultados: Dict[int, dict], intentos: Dict[int, int]):
+        """Sustituye un worker caído o bloqueado y reprograma sus tareas pendientes."""
+        self._terminar(w)
+        for idx, texto in w.en_vuelo.items():
+            intentos[idx] = intentos.get(idx, 0) + 1
+            if intentos[idx] >= self.MAX_REINTENTOS:
+                resultados[idx] = {"texto": texto,
+                                   "error": f"el worker terminó procesando este texto "
+                                            f"(exitcode {w.proceso.exitcode})"}
+            else:
+                reintentar.append((idx, texto))
+        self._workers[self._workers.index(w)] = self._arrancar_workers(1)[0]
+        self.reinicios += 1
+
+    def _enviar(self, w: _Worker, idx: int, model_key: str, texto: str) -> bool:
+        """Envía una tarea; devuelve False si el worker ya no está."""
+        if not w.en_vuelo:
+            w.desde = time.monotonic()
+        w.en_vuelo[idx] = texto
+        try:
+            w.conexion.send((idx, model_key, texto))
+            return True
+        except OSError:
+            return False
+
+    def _recoger(self, reintentar: deque, resultados: Dict[int, dict], intentos: Dict[int, int]):
+        """
+        Espera a que algún worker devuelva un resultado, muera o supere el
+        plazo de su tarea en curso, y actúa en consecuencia.
+        """
+        ocupados = [w for w in self._workers if w.en_vuelo]
+        limite = min(w.desde for w in ocupados) + self.timeout
+        esperas = [w.conexion for w in ocupados] + [w.proceso.sentinel for w in ocupados]
+        mp.connection.wait(esperas, timeout=max(0.0, limite - time.monotonic()))
+
+        for w in ocupados:
+            caido = False
+            try:
+                while w.conexion.poll():
+                    idx, _, resumen = w.conexion.recv()
+                    resultados[idx] = resumen
+                    del w.en_vuelo[idx]
+                    w.desde = time.monotonic()
+            except (EOFError, OSError):
+                caido = True
+            if caido or not w.proceso.is_alive():
+                self._reemplazar(w, reintentar, resultados, intentos)
+            elif w.en_vuelo and time.monotonic() - w.desde > self.timeout:
+                # Vivo pero sin responder (p. ej. un bloqueo tras el fork)
+                self._reemplazar(w, reintentar, resultados, intentos)
+
+    def analizar(self, textos, model_key: Optional[str] = None) -> List[dict]:
+        """
+        Reparte los textos entre los workers y devuelve los resultados en el
+        mismo orden de entrada. Nunca hay más de 2 tareas por worker en vuelo,
+        de modo que la entrada se consume a medida que se procesa.
+        """
+        if not self._workers:
+            raise RuntimeError("El pool no está iniciado (llama a iniciar()).")
+        model_key = model_key or self.model_keys[0]
+
+        resultados: Dict[int, dict] = {}
+        intentos: Dict[int, int] = {}
+        reintentar: deque = deque()
+        entrada = iter(textos)
+        agotada = False
+        enviados = 0
+
+        while True:
+            for w in list(self._workers):
+                while len(w.en_vuelo) < 2:
+                    if reintentar:
+                        idx, texto = reintentar.popleft()
+                    elif not agotada:
+                        try:
+                            texto = next(entrada)
+                        except StopIteration:
+                            agotada = True
+                            break
+                        idx = enviados
+                        enviados += 1
+                    else:
+                        break
+                    if not self._enviar(w, idx, model_key, texto):
+                        # Murió entre tareas: _recoger lo sustituirá
+                        break
+            if not any(w.en_vuelo for w in self._workers):
+                break
+            self._recoger(reintentar, resultados, intentos)
+
+        return [resultados[i] for i in range(enviados)]
+
+    def informe_memoria(self) -> Dict[int, Optional[Tuple[int, int]]]:
+        """Devuelve {pid: (RSS kB, PSS kB)} de cada worker."""
+        return {p.pid: leer_memoria(p.pid) for p in self.procesos}
+
+    def cerrar(self):
+        """Envía la señal de parada a todos los workers y espera a que terminen."""
+        for w in self._workers:
+            try:
+                w.conexion.send(None)
+            except OSError:
+                pass
+        for w in self._workers:
+            w.proceso.join(self.timeout)
+            self._terminar(w)
+        self._workers = []
+        if self.precargar:
+            gc.unfreeze()
+
+    def __enter__(self):
+        self.iniciar()
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def _imprimir_informe(titulo: str, pool: PoolPrecargado, n_textos: int, tiempo_analisis: float):
+    print(f"\n== {titulo} ==")
+    print(f" - Workers: {pool.n_workers} | modelos: {', '.join(pool.model_keys)}")
+    print(f" - Tiempo de arranque: {pool.tiempo_arranque:.2f} s | workers reiniciados: {pool.reinicios}")
+    print(f" - Análisis de {n_textos} textos: {tiempo_analisis:.2f} s")
+    print(" - Memoria por worker (pid | RSS | PSS):")
+    total_pss = 0
+    for pid, mem in pool.informe_memoria().items():
+        if mem is None:
+            print(f"   {pid:>7} | (no disponible en este sistema)")
+            continue
+        rss, pss = mem
+        total_pss += pss
+        print(f"   {pid:>7} | {rss / 1024:8.1f} MB | {pss / 1024:8.1f} MB")
+    if total_pss:
+        print(f" - PSS total de los workers: {total_pss / 1024:.1f} MB")
+
+
+def main(argv: List[str]):
+    """
+    Compara el pool pre-fork (modelo cargado una vez y compartido) con
+    workers que cargan su propia copia del modelo.
+    Uso: python nlp_worker_pool.py [--workers N] [--models es,en_md] [--input FICHERO]
+    """
+    n_workers = 2
+    model_keys = ["es"]
+    textos = ["la niña vende la nueva computadora",
+              "el perro mira el rápido gato",
+              "Madrid es la capital de España"] * 20
+
+    args = argv[1:]
+    try:
+        while args:
+            opcion = args.pop(0)
+            if opcion == "--workers":
+                n_workers = int(args.pop(0))
+            elif opcion == "--models":
+                model_keys = args.pop(0).split(",")
+            elif opcion == "--input":
+                with open(args.pop(0), encoding="utf-8") as f:
+                    textos = [linea.strip() for linea in f if linea.strip()]
+            else:
+                print(f"Opción desconocida: {opcion}")
+                print(main.__doc__)
+                return
+    except (IndexError, ValueError, OSError) as e:
+        print(f"Argumentos inválidos: {e}")
+        print(main.__doc__)
+        return
+
+    for titulo, precargar in (("Pool pre-fork (modelo compartido)", True),
+                              ("Workers independientes (una carga por worker)", False)):
+        try:
+            pool = PoolPrecargado(model_keys, n_workers, precargar=precargar)
+            pool.iniciar()
+        except (ValueError, OSError) as e:
+            print(f"Error al iniciar el pool: {e}")
+            print("Asegúrate de tener instalados los modelos, ej:")
+            print("  python -m spacy download es_core_news_sm")
+            return
+        try:
+            inicio = time.perf_counter()
+            pool.analizar(textos)
+            _imprimir_informe(titulo, pool, len(textos), time.perf_counter() - inicio)
+        finally:
+            pool.cerrar()
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -7,6 +7,7 @@ Gramática:
 
 import ply.lex as lex
 import sys
+from tabla_simbolos import TablaSimbolos
 
 # Lexer
 
@@ -93,6 +94,20 @@ def t_error(t):
 
 lexer = lex.lex()
 
+def error_lexico_silencioso(t):
+    """Como t_error, pero sin imprimir (para uso como biblioteca)."""
+    t.lexer.skip(1)
+    raise SyntaxError(f"Error Léxico: Carácter inesperado '{t.value[0]}'")
+
+def crear_lexer():
+    """
+    Copia independiente del lexer que no imprime en los errores léxicos:
+    solo lanza SyntaxError. Cada hilo o sesión debe usar la suya.
+    """
+    nuevo = lexer.clone()
+    nuevo.lexerrorf = error_lexico_silencioso
+    return nuevo
+
 
 # Parser LL1
 
@@ -139,9 +154,17 @@ def agregar_pila(produccion):
         if elemento != 'vacia': 
             stack.append(elemento)
 
-def miParser(lexer):
-    """Función principal del parser LL(1)"""
+def miParser(lexer, simbolos=None):
+    """
+    Función principal del parser LL(1).
+    Si se pasa una TablaSimbolos, cada identificador declarado se registra
+    en ella (análisis semántico durante el parseo). Las declaraciones se
+    guardan hasta llegar al ';', así una instrucción con error de sintaxis
+    no deja símbolos a medias en la tabla.
+    """
     
+    tipo_actual = None
+    pendientes = []
     tok = lexer.token()
     if not tok:
         # Maneja entrada vacía
@@ -158,6 +181,15 @@ def miParser(lexer):
             return
         else:
             if x == tok.type and x != 'eof':
+                if simbolos is not None:
+                    if x == 'int' or x == 'float':
+                        tipo_actual = x
+                    elif x == 'identificador':
+                        pendientes.append((tok.value, tipo_actual, tok.lineno))
+                    elif x == 'finInstruccion':
+                        for nombre, tipo, linea in pendientes:
+                            simbolos.declarar(nombre, tipo, linea)
+                        pendientes = []
                 stack.pop()
                 x = stack[-1]
                 tok = lexer.token()
@@ -184,7 +216,7 @@ def miParser(lexer):
             else:
                 raise SystemError("Error del parser")
 
-def parse_string(input_text):
+def parse_string(input_text, simbolos=None):
     """
     Añade el símbolo de fin de cadena y ejecuta el parser.
     """
@@ -192,13 +224,70 @@ def parse_string(input_text):
         input_text += ' $'
         
     lexer.input(input_text)
+    lexer.lineno = 1
 
     global stack
     stack = ['eof', S] 
     
-    miParser(lexer)
+    miParser(lexer, simbolos)
     return True
 
+class _LexerSentencia:
+    """
+    Entrega al parser los tokens de una sola instrucción (hasta el ';')
+    seguidos de un token 'eof', para validar textos con varias instrucciones.
+    """
+    def __init__(self, lexer):
+        self.lexer = lexer
+        self.terminada = False
+        self.hay_tokens = False
+
+    def token(self):
+        if not self.terminada:
+            try:
+                tok = self.lexer.token()
+            except SyntaxError:
+                # Error léxico: la instrucción existe aunque no haya dado tokens
+                self.hay_tokens = True
+                raise
+            if tok is not None:
+                self.hay_tokens = True
+                self.terminada = tok.type == 'finInstruccion'
+                return tok
+            self.terminada = True
+        tok = lex.LexToken()
+        tok.type, tok.value = 'eof', '$'
+        tok.lineno, tok.lexpos = self.lexer.lineno, self.lexer.lexpos
+        return tok
+
+def analizar_texto(input_text, simbolos):
+    """
+    Valida un texto con varias declaraciones y registra los identificadores
+    en la tabla de símbolos. Devuelve la lista de errores de sintaxis
+    (los semánticos quedan en simbolos.errores()).
+    """
+    global stack
+    lexer.input(input_text)
+    lexer.lineno = 1
+    errores = []
+    while True:
+        sentencia = _LexerSentencia(lexer)
+        stack = ['eof', S]
+        try:
+            miParser(sentencia, simbolos)
+        except (SyntaxError, SystemError) as e:
+            if not sentencia.hay_tokens:
+                # Fin del texto
+                break
+            errores.append(f"Línea {lexer.lineno}: {e}")
+            # Saltar hasta el final de la instrucción errónea
+            while not sentencia.terminada:
+                try:
+                    sentencia.token()
+                except SyntaxError:
+                    pass
+    return errores
+
 def main():
     """Función principal de la aplicación"""
     if len(sys.argv) < 2:
@@ -208,9 +297,12 @@ def main():
     input_text = " ".join(sys.argv[1:])
     print(f"Entrada: {input_text}")
 
+    simbolos = TablaSimbolos()
     try:
-        parse_string(input_text)
+        parse_string(input_text, simbolos)
         print("La cadena cumple con la gramática formal.")
+        for error in simbolos.errores():
+            print(error)
     except (SyntaxError, SystemError) as e:
         print(f"La cadena no cumple la gramática formal.")
         print(f"{e}")
@@ -0,0 +1,225 @@
+"""
+Compilador de la tabla LL(1) a código Python especializado.
+
+En lugar de interpretar la tabla con una pila (miParser), se genera una
+función por cada No-Terminal:
+  - la selección de producción es una cadena de if sobre el tipo del token,
+  - los terminales se comparan directamente (sin 'x in tokens'),
+  - la recursión de cola de un No-Terminal sobre sí mismo (D -> coma identificador D)
+    se convierte en un bucle, así que las listas largas no crecen la pila,
+  - el fin de la entrada (token None) se trata como 'eof' sin crear LexToken.
+
+El código generado se guarda en __pycache__ con un nombre que depende del
+hash de la tabla, así solo se regenera cuando la gramática cambia.
+"""
+
+import os
+import time
+import hashlib
+import importlib.util
+
+import parser as ll1
+
+# Se incrementa si cambia la forma del código generado (invalida la caché)
+VERSION_GENERADOR = 1
+
+DIR_CACHE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__pycache__")
+
+
+def hash_tabla(tabla, tokens):
+    """Hash estable de la gramática (tabla + terminales + versión del generador)."""
+    contenido = repr((VERSION_GENERADOR, tabla, tokens)).encode("utf-8")
+    return hashlib.sha1(contenido).hexdigest()[:16]
+
+
+def _agrupar_producciones(tabla, no_terminal):
+    """
+    Devuelve [(terminales, produccion), ...] para un No-Terminal, agrupando
+    los terminales que llevan a la misma producción (ej: int|float -> TT ...).
+    Las celdas None (error) se omiten: caen en el 'raise' final.
+    """
+    grupos = []
+    for nt, terminal, produccion in tabla:
+        if nt != no_terminal or produccion is None:
+            continue
+        for terminales, prod in grupos:
+            if prod == produccion:
+                terminales.append(terminal)
+                break
+        else:
+            grupos.append(([terminal], produccion))
+    return grupos
+
+
+def generar_codigo(tabla, tokens, inicial):
+    """Genera el código fuente Python del parser especializado para la tabla."""
+    no_terminales = []
+    for fila in tabla:
+        if fila[0] not in no_terminales:
+            no_terminales.append(fila[0])
+
+    lineas = [
+        "# Generado automáticamente por parser_compilado.py -- NO EDITAR",
+        f"# hash de la gramática: {hash_tabla(tabla, tokens)}",
+        "",
+        "def _esperado(esperado, tok):",
+        "    encontrado = 'eof' if tok is None else tok.type",
+        "    raise SyntaxError(f\"Error de Sintaxis: Se esperaba '{esperado}' pero se encontró '{encontrado}'\")",
+        "",
+        "def _inesperado(estado, tok):",
+        "    if tok is None:",
+        "        raise SyntaxError(f\"Error de Sintaxis: Entrada inesperada 'eof' para el estado '{estado}' al final de la entrada\")",
+        "    raise SyntaxError(f\"Error de Sintaxis: Entrada inesperada '{tok.type}' para el estado '{estado}' en pos {tok.lexpos}\")",
+        "",
+    ]
+
+    for nt in no_terminales:
+        grupos = _agrupar_producciones(tabla, nt)
+        recursivo = any(prod and prod[-1] == nt for _, prod in grupos)
+        ind = "        " if recursivo else "    "
+
+        lineas.append(f"def parse_{nt}(siguiente, tok):")
+        if recursivo:
+            lineas.append("    while True:")
+        lineas.append(f"{ind}t = 'eof' if tok is None else tok.type")
+
+        for i, (terminales, produccion) in enumerate(grupos):
+            palabra = "if" if i == 0 else "elif"
+            if len(terminales) == 1:
+                lineas.append(f"{ind}{palabra} t == {terminales[0]!r}:")
+            else:
+                lineas.append(f"{ind}{palabra} t in {tuple(terminales)!r}:")
+
+            simbolos = [s for s in produccion if s != 'vacia']
+            cola = recursivo and simbolos and simbolos[-1] == nt
+            if cola:
+                simbolos = simbolos[:-1]
+
+            for j, simbolo in enumerate(simbolos):
+                if simbolo in no_terminales:
+                    lineas.append(f"{ind}    tok = parse_{simbolo}(siguiente, tok)")
+                elif j == 0 and terminales == [simbolo]:
+                    # El lookahead ya es este terminal: solo avanzar
+                    lineas.append(f"{ind}    tok = siguiente()")
+                else:
+                    lineas.append(f"{ind}    if tok is None or tok.type != {simbolo!r}:")
+                    lineas.append(f"{ind}        _esperado({simbolo!r}, tok)")
+                    lineas.append(f"{ind}    tok = siguiente()")
+
+            lineas.append(f"{ind}    continue" if cola else f"{ind}    return tok")
+
+        lineas.append(f"{ind}_inesperado({nt!r}, tok)")
+        lineas.append("")
+
+    lineas += [
+        "def parse(lexer):",
+        "    siguiente = lexer.token",
+        "    tok = siguiente()",
+        "    if tok is None:",
+        "        return",
+        f"    tok = parse_{inicial}(siguiente, tok)",
+        "    if tok is not None and tok.type != 'eof':",
+        "        _esperado('eof', tok)",
+        "",
+    ]
+    return "\n".join(lineas)
+
+
+def cargar_parser(tabla=ll1.tabla, tokens=ll1.tokens, inicial=ll1.S):
+    """
+    Devuelve el módulo del parser compilado para la tabla, generándolo y
+    guardándolo en disco solo si no existe ya en la caché.
+    """
+    nombre = f"ll1_generado_{hash_tabla(tabla, tokens)}"
+    ruta = os.path.join(DIR_CACHE, nombre + ".py")
+
+    if not os.path.exists(ruta):
+        os.makedirs(DIR_CACHE, exist_ok=True)
+        # Escritura atómica: otro proceso nunca ve un fichero a medias
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, "w", encoding="utf-8") as f:
+            f.write(generar_codigo(tabla, tokens, inicial))
+        os.replace(temporal, ruta)
+
+    spec = importlib.util.spec_from_file_location(nombre, ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+_parser = None
+
+
+def parse_string(input_text):
+    """Igual que parser.parse_string, pero usando el parser compilado."""
+    global _parser
+    if _parser is None:
+        _parser = cargar_parser()
+
+    if not input_text.strip().endswith('$'):
+        input_text += ' $'
+
+    ll1.lexer.input(input_text)
+    _parser.parse(ll1.lexer)
+    return True
+
+
+# Benchmark: parser interpretado (miParser) vs compilado
+
+class _ListaTokens:
+    """Imita la interfaz lexer.token() sobre una lista de tokens ya léxicos."""
+
+    def __init__(self, toks):
+        self._it = iter(toks)
+
+    def token(self):
+        return next(self._it, None)
+
+
+def _lexear(texto):
+    ll1.lexer.input(texto)
+    return list(iter(ll1.lexer.token, None))
+
+
+def _medir(func, repeticiones):
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        func()
+    return (time.perf_counter() - inicio) / repeticiones
+
+
+def main():
+    """Compara ambos parsers sobre declaraciones con muchos identificadores."""
+    compilado = cargar_parser()
+
+    for n in (1_000, 10_000, 100_000):
+        texto = "int " + ", ".join(f"v{i}" for i in range(n)) + " ; $"
+        toks = _lexear(texto)
+
+        def interpretado():
+            ll1.stack = ['eof', ll1.S]
+            ll1.miParser(_ListaTokens(toks))
+
+        def especializado():
+            compilado.parse(_ListaTokens(toks))
+
+        t_int = _medir(interpretado, 5)
+        t_com = _medir(especializado, 5)
+        print(f"{n:>8} identificadores ({len(toks)} tokens): "
+              f"interpretado {t_int * 1000:8.2f} ms | compilado {t_com * 1000:8.2f} ms | "
+              f"x{t_int / t_com:.1f}")
+
+    # Comprobación rápida de que ambos aceptan/rechazan lo mismo
+    for caso in ("int x ; $", "float a, b, c ; $", "int contador = 10 ; $", "int x, ; $"):
+        resultados = []
+        for parse in (ll1.parse_string, parse_string):
+            try:
+                parse(caso)
+                resultados.append("ACEPTADO")
+            except SyntaxError:
+                resultados.append("RECHAZADO")
+        print(f"  {caso!r:28} interpretado={resultados[0]:9} compilado={resultados[1]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,445 @@
+"""
+Reparseo incremental de ficheros con muchas declaraciones.
+
+El texto se divide en segmentos, uno por instrucción: cada segmento va desde
+el final de la instrucción anterior hasta su propio 'finInstruccion' (;)
+incluido, así que el espacio y los comentarios previos pertenecen al segmento.
+Cada segmento guarda sus tokens y el resultado de parsearlo.
+
+Al aplicar una edición solo se vuelven a lexear y parsear los segmentos que
+toca; el resto se reutiliza. Los segmentos se agrupan en bloques de tamaño
+acotado, de modo que localizar una posición y reemplazar segmentos no exige
+recorrer ni desplazar todo el fichero: la posición de cada bloque se obtiene
+de un árbol de Fenwick con las longitudes de los bloques.
+
+Tras una edición se absorben instrucciones vecinas (anteriores o
+siguientes) hasta que el lexer se resincroniza, ver apply_edit.
+"""
+
+import sys
+import time
+import random
+import itertools
+from typing import List, Optional, Tuple
+
+import parser as ll1
+import parser_compilado
+
+# Número objetivo de segmentos por bloque
+TAM_BLOQUE = 128
+
+
+class Segmento:
+    """Una instrucción del fichero con sus tokens y su resultado de parseo."""
+
+    __slots__ = ("texto", "tokens", "error")
+
+    def __init__(self, texto, tokens, error):
+        self.texto = texto
+        self.tokens = tokens    # LexToken con lexpos relativo al segmento
+        self.error = error      # None si la instrucción es válida
+
+    def __repr__(self):
+        return f"Segmento({self.texto!r}, error={self.error!r})"
+
+
+def _contar(segmentos: List[Segmento], marca: str) -> int:
+    """Número de segmentos cuyo texto contiene la marca ('/*' o '*/')."""
+    return sum(1 for seg in segmentos if marca in seg.texto)
+
+
+def _ultima_linea(texto: str) -> str:
+    return texto[texto.rfind('\n') + 1:]
+
+
+class _ListaTokens:
+    """Interfaz lexer.token() sobre la lista de tokens de un segmento."""
+
+    def __init__(self, toks):
+        self._it = iter(toks)
+
+    def token(self):
+        return next(self._it, None)
+
+
+class SesionIncremental:
+    """
+    Mantiene el estado de parseo de un texto y lo actualiza con cada edición.
+
+    Uso:
+        sesion = SesionIncremental(texto)
+        sesion.apply_edit(offset, old_len, new_text)
+        sesion.errores()
+    """
+
+    def __init__(self, texto: str):
+        self._lexer = ll1.crear_lexer()
+        self._parser = parser_compilado.cargar_parser()
+        self._bloques: List[List[Segmento]] = []
+        self._longitudes: List[int] = []   # caracteres de cada bloque
+        self._aperturas: List[int] = []    # segmentos con '/*' de cada bloque
+        self._cierres: List[int] = []      # segmentos con '*/' de cada bloque
+        self._arbol: List[int] = [0]       # árbol de Fenwick sobre _longitudes
+        self._total = 0
+        self.n_errores = 0
+
+        segmentos, resto = self._segmentar(texto)
+        if resto or not segmentos:
+            segmentos.append(self._crear_segmento(resto))
+        self._reemplazar_bloques(0, 0, segmentos)
+
+    # --- Lexeo y parseo de segmentos ---
+
+    def _lexear(self, texto: str):
+        """Devuelve (tokens, errores_lexicos) del texto dado."""
+        self._lexer.input(texto)
+        self._lexer.lineno = 1
+        toks = []
+        errores = []
+        while True:
+            try:
+                tok = self._lexer.token()
+            except SyntaxError as e:
+                # El error léxico ya avanzó un carácter: seguimos lexeando
+                errores.append((self._lexer.lexpos - 1, str(e)))
+                continue
+            if tok is None:
+                break
+            toks.append(tok)
+        return toks, errores
+
+    def _parsear(self, tokens, errores_lexicos) -> Optional[str]:
+        """Devuelve el mensaje de error de una instrucción o None si es válida."""
+        if errores_lexicos:
+            return errores_lexicos[0][1]
+        if not tokens:
+            return None
+        try:
+            self._parser.parse(_ListaTokens(tokens))
+        except SyntaxError as e:
+            return str(e)
+        return None
+
+    def _crear_segmento(self, texto: str) -> Segmento:
+        tokens, errores = self._lexear(texto)
+        return Segmento(texto, tokens, self._parsear(tokens, errores))
+
+    def _segmentar(self, texto: str) -> Tuple[List[Segmento], str]:
+        """
+        Lexea el texto y lo corta después de cada 'finInstruccion'.
+        Devuelve los segmentos completos y el texto sobrante del final.
+        """
+        tokens, errores = self._lexear(texto)
+        segmentos = []
+        inicio = 0
+        actuales = []
+        i_err = 0
+        for tok in tokens:
+            tok.lexpos -= inicio
+            actuales.append(tok)
+            if tok.type == 'finInstruccion':
+                fin = inicio + tok.lexpos + 1
+                propios = []
+                while i_err < len(errores) and errores[i_err][0] < fin:
+                    propios.append(errores[i_err])
+                    i_err += 1
+                segmentos.append(Segmento(texto[inicio:fin], actuales,
+                                          self._parsear(actuales, propios)))
+                inicio = fin
+                actuales = []
+        return segmentos, texto[inicio:]
+
+    # --- Gestión de bloques ---
+
+    def _reconstruir_arbol(self):
+        """Construye el árbol de Fenwick de las longitudes de bloque en O(n)."""
+        n = len(self._longitudes)
+        arbol = [0] + self._longitudes
+        for i in range(1, n + 1):
+            j = i + (i & -i)
+            if j <= n:
+                arbol[j] += arbol[i]
+        self._arbol = arbol
+
+    def _sumar_longitud(self, bloque: int, delta: int):
+        self._longitudes[bloque] += delta
+        self._total += delta
+        i = bloque + 1
+        while i < len(self._arbol):
+            self._arbol[i] += delta
+            i += i & -i
+
+    def _reemplazar_bloques(self, b0: int, b1: int, segmentos: List[Segmento]):
+        """
+        Sustituye los bloques b0..b1-1 por los segmentos dados. Si solo cambia
+        un bloque y no crece demasiado, se actualiza en su sitio en O(log n);
+        si no, se reparten en bloques de TAM_BLOQUE y se reconstruye el árbol.
+        """
+        for segs in self._bloques[b0:b1]:
+            self.n_errores -= sum(1 for s in segs if s.error)
+        self.n_errores += sum(1 for s in segmentos if s.error)
+
+        if b1 - b0 == 1 and 0 < len(segmentos) <= 2 * TAM_BLOQUE:
+            self._bloques[b0] = segmentos
+            self._aperturas[b0] = _contar(segmentos, '/*')
+            self._cierres[b0] = _contar(segmentos, '*/')
+            self._sumar_longitud(b0, sum(len(s.texto) for s in segmentos) - self._longitudes[b0])
+            return
+
+        nuevos = [segmentos[i:i + TAM_BLOQUE] for i in range(0, len(segmentos), TAM_BLOQUE)]
+        self._bloques[b0:b1] = nuevos
+        self._longitudes[b0:b1] = [sum(len(s.texto) for s in segs) for segs in nuevos]
+        self._aperturas[b0:b1] = [_contar(segs, '/*') for segs in nuevos]
+        self._cierres[b0:b1] = [_contar(segs, '*/') for segs in nuevos]
+        self._total = sum(self._longitudes)
+        self._reconstruir_arbol()
+
+    def _localizar(self, offset: int) -> Tuple[int, int, int]:
+        """
+        Devuelve (bloque, segmento, inicio_del_segmento) del segmento que
+        contiene el carácter en 'offset'. Un offset igual a la longitud total
+        cae en el último segmento. El bloque se busca bajando por el árbol
+        de Fenwick (O(log n)) y el segmento dentro del bloque.
+        """
+        arbol = self._arbol
+        b = 0
+        inicio = 0
+        paso = 1 << (len(arbol) - 1).bit_length()
+        while paso:
+            siguiente = b + paso
+            if siguiente < len(arbol) and inicio + arbol[siguiente] <= offset:
+                b = siguiente
+                inicio += arbol[siguiente]
+            paso >>= 1
+
+        if b < len(self._bloques):
+            for s, seg in enumerate(self._bloques[b]):
+                if offset < inicio + len(seg.texto):
+                    return b, s, inicio
+                inicio += len(seg.texto)
+        b = len(self._bloques) - 1
+        s = len(self._bloques[b]) - 1
+        return b, s, self._total - len(self._bloques[b][s].texto)
+
+    def _primer_bloque_con_apertura(self, hasta: int) -> int:
+        """Índice del primer bloque anterior a 'hasta' que contiene un '/*' (o -1)."""
+        for b in range(hasta):
+            if self._aperturas[b]:
+                return b
+        return -1
+
+    def _ultimo_bloque_con_cierre(self, desde: int) -> int:
+        """Índice del último bloque posterior a 'desde' que contiene un '*/' (o -1)."""
+        for b in range(len(self._bloques) - 1, desde, -1):
+            if self._cierres[b]:
+                return b
+        return -1
+
+    def _linea_hacia_atras(self, prefijo: List[Segmento], primero: int) -> str:
+        """Texto desde el último salto de línea anterior a la región hasta ella."""
+        anteriores = (seg for b in range(primero - 1, -1, -1) for seg in reversed(self._bloques[b]))
+        partes = []
+        for seg in itertools.chain(reversed(prefijo), anteriores):
+            partes.append(_ultima_linea(seg.texto))
+            if '\n' in seg.texto:
+                break
+        return "".join(reversed(partes))
+
+    def _linea_hacia_delante(self, sufijo: List[Segmento], ultimo: int) -> str:
+        """Texto desde el final de la región hasta el siguiente salto de línea."""
+        siguientes = (seg for b in range(ultimo + 1, len(self._bloques)) for seg in self._bloques[b])
+        partes = []
+        for seg in itertools.chain(sufijo, siguientes):
+            partes.append(seg.texto.split('\n', 1)[0])
+            if '\n' in seg.texto:
+                break
+        return "".join(partes)
+
+    # --- API pública ---
+
+    def __len__(self):
+        return self._total
+
+    @property
+    def texto(self) -> str:
+        return "".join(seg.texto for bloque in self._bloques for seg in bloque)
+
+    def apply_edit(self, offset: int, old_len: int, new_text: str) -> int:
+        """
+        Reemplaza old_len caracteres a partir de offset por new_text y
+        reparsea solo las instrucciones afectadas.
+        Devuelve el número de segmentos que se volvieron a parsear.
+        """
+        total = len(self)
+        if offset < 0 or old_len < 0 or offset + old_len > total:
+            raise ValueError(f"Edición fuera de rango: offset={offset}, old_len={old_len}, longitud={total}")
+
+        b0, s0, inicio = self._localizar(offset)
+        b1, s1, _ = self._localizar(offset + old_len - 1) if old_len else (b0, s0, inicio)
+
+        # Texto de la región afectada (del primer al último segmento tocado)
+        afectados = []
+        for b in range(b0, b1 + 1):
+            desde = s0 if b == b0 else 0
+            hasta = s1 + 1 if b == b1 else len(self._bloques[b])
+            afectados.extend(self._bloques[b][desde:hasta])
+        region = "".join(seg.texto for seg in afectados)
+        rel = offset - inicio
+        region = region[:rel] + new_text + region[rel + old_len:]
+
+        # Los segmentos no afectados de los bloques implicados se reinsertan
+        prefijo = self._bloques[b0][:s0]
+        sufijo = self._bloques[b1][s1 + 1:]
+        primero, ultimo = b0, b1
+
+        # Se absorben segmentos vecinos hasta que los cortes sean seguros:
+        #  - la región termina en ';' (si no, la instrucción sigue después),
+        #  - ninguna cadena puede cruzar un corte dentro de la misma línea,
+        #  - ningún '/*' de la región llega a un '*/' posterior y ningún '*/'
+        #    de la región alarga un '/*' anterior (la regex del comentario de
+        #    bloque es voraz: va hasta el último '*/' del texto).
+        # A partir de ahí los tokens antiguos coinciden con los de un lexeo completo.
+        nuevos, resto = self._segmentar(region)
+        while True:
+            if not prefijo and primero > 0:
+                primero -= 1
+                prefijo = list(self._bloques[primero])
+            if not sufijo and ultimo + 1 < len(self._bloques):
+                ultimo += 1
+                sufijo = list(self._bloques[ultimo])
+
+            # Trozos de línea a cada lado de los cortes (inicio y final de la región)
+            izquierda = self._linea_hacia_atras(prefijo, primero)
+            derecha = self._linea_hacia_delante(sufijo, ultimo)
+            primera, ultima = region.split('\n', 1)[0], _ultima_linea(region)
+            if '\n' not in region:
+                primera = ultima = izquierda + region + derecha
+
+            antes = 0
+            if prefijo and '"' in izquierda and '"' in primera:
+                antes = 1
+            elif prefijo and '*/' in region:
+                b = self._primer_bloque_con_apertura(primero)
+                if b >= 0:
+                    prefijo[:0] = [seg for bloque in self._bloques[b:primero] for seg in bloque]
+                    primero = b
+                antes = len(prefijo) - next((i for i, seg in enumerate(prefijo) if '/*' in seg.texto),
+                                            len(prefijo))
+
+            despues = 0
+            if sufijo and (resto or ('"' in ultima and '"' in derecha)):
+                despues = 1
+            elif sufijo and '/*' in region:
+                b = self._ultimo_bloque_con_cierre(ultimo)
+                for extra in range(ultimo + 1, b + 1):
+                    sufijo.extend(self._bloques[extra])
+                ultimo = max(ultimo, b)
+                despues = max((i + 1 for i, seg in enumerate(sufijo) if '*/' in seg.texto), default=0)
+
+            if not antes and not despues:
+                break
+            region = ("".join(seg.texto for seg in prefijo[len(prefijo) - antes:]) + region +
+                      "".join(seg.texto for seg in sufijo[:despues]))
+            del prefijo[len(prefijo) - antes:]
+            del sufijo[:despues]
+            nuevos, resto = self._segmentar(region)
+        if resto:
+            nuevos.append(self._crear_segmento(resto))
+
+        segmentos = prefijo + nuevos + sufijo
+        if not segmentos and primero == 0 and ultimo == len(self._bloques) - 1:
+            segmentos = [self._crear_segmento("")]
+        self._reemplazar_bloques(primero, ultimo + 1, segmentos)
+        return len(nuevos)
+
+    def errores(self) -> List[Tuple[int, str]]:
+        """
+        Lista de (offset, mensaje) de las instrucciones inválidas. La línea
+        del mensaje se calcula aquí a partir del texto, no la da el lexer.
+        """
+        resultado = []
+        inicio = 0
+        linea = 1
+        for bloque in self._bloques:
+            for seg in bloque:
+                if seg.error:
+                    texto = seg.texto
+                    pos = seg.tokens[0].lexpos if seg.tokens else len(texto) - len(texto.lstrip())
+                    n_linea = linea + texto.count('\n', 0, pos)
+                    resultado.append((inicio, f"Línea {n_linea}: {seg.error}"))
+                linea += seg.texto.count('\n')
+                inicio += len(seg.texto)
+        return resultado
+
+    @property
+    def valido(self) -> bool:
+        return self.n_errores == 0
+
+
+# Benchmark: reproduce una traza de ediciones sobre un fichero de 100k líneas
+
+def _traza_ediciones(sesion: SesionIncremental, n: int, semilla: int = 0):
+    """Genera ediciones típicas de un editor sobre el texto actual."""
+    rnd = random.Random(semilla)
+    for i in range(n):
+        longitud = len(sesion)
+        offset = rnd.randrange(longitud)
+        tipo = i % 4
+        if tipo == 0:
+            yield offset, 0, "z"                             # teclear un carácter
+        elif tipo == 1:
+            yield offset, min(1, longitud - offset), ""      # borrar un carácter
+        elif tipo == 2:
+            yield offset, 0, f"\nfloat nueva{i} ;\n"        # pegar una declaración
+        else:
+            yield offset, min(5, longitud - offset), "a, b"  # reemplazar un trozo
+
+
+def main(argv: List[str]):
+    n_lineas = int(argv[1]) if len(argv) > 1 else 100_000
+    n_ediciones = int(argv[2]) if len(argv) > 2 else 2_000
+    texto = "".join(f"int v{i}, w{i} ;\n" for i in range(n_lineas))
+
+    inicio = time.perf_counter()
+    sesion = SesionIncremental(texto)
+    t_completo = time.perf_counter() - inicio
+    print(f"Fichero: {n_lineas} líneas, {len(texto)} caracteres")
+    print(f"Parseo completo inicial: {t_completo * 1000:.1f} ms")
+
+    latencias = []
+    reparseados = 0
+    for offset, old_len, new_text in _traza_ediciones(sesion, n_ediciones):
+        t0 = time.perf_counter()
+        reparseados += sesion.apply_edit(offset, old_len, new_text)
+        latencias.append(time.perf_counter() - t0)
+
+    latencias.sort()
+    media = sum(latencias) / len(latencias)
+    print(f"Ediciones aplicadas: {n_ediciones} "
+          f"({reparseados / n_ediciones:.1f} segmentos reparseados por edición)")
+    print(f"Latencia media: {media * 1000:.3f} ms | "
+          f"p50: {latencias[len(latencias) // 2] * 1000:.3f} ms | "
+          f"p99: {latencias[int(len(latencias) * 0.99)] * 1000:.3f} ms")
+    print(f"Aceleración frente a reparsear todo: x{t_completo / media:.0f}")
+
+    # Verificación: el estado incremental coincide con un parseo desde cero
+    coincide = SesionIncremental(sesion.texto).errores() == sesion.errores()
+    print(f"Errores actuales: {sesion.n_errores} | coincide con parseo completo: {coincide}")
+
+    # Casos en los que la edición cambia cómo se lexea el texto siguiente
+    casos = [
+        ("int a ;\nint b ;\n*/ int c ;\n", 0, 0, "/*"),        # abre un comentario
+        ("int a ;\nint b ;\n*/ int c ;\n", 0, 0, "/* x */"),   # la regex voraz llega al '*/'
+        ('int a ; int b ;" int c ;\n', 7, 0, ' "'),            # abre una cadena en la línea
+        ("int a ;\nint b ;\nint c ;\n", 6, 1, ""),             # borra un ';'
+    ]
+    for texto, offset, old_len, new_text in casos:
+        sesion = SesionIncremental(texto)
+        sesion.apply_edit(offset, old_len, new_text)
+        esperado = SesionIncremental(sesion.texto).errores()
+        estado = "OK" if sesion.errores() == esperado else f"DIFERENTE: {sesion.errores()}"
+        print(f"  {sesion.texto!r:42} {len(esperado)} errores | {estado}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,210 @@
+"""
+Tabla de símbolos compacta para el análisis semántico de declaraciones.
+
+Guarda identificador -> (tipo, línea, fichero) de la primera declaración y
+detecta:
+  - redeclaraciones:     int x, x;
+  - conflictos de tipo:  int x; float x;
+
+Para escalar a millones de identificadores no se crea un objeto ni un dict
+por símbolo: hay un único dict nombre -> posición (el dict guarda la única
+copia de cada nombre) y el resto de datos va en arrays de enteros.
+Las tablas de distintos ficheros o fragmentos se pueden fusionar.
+"""
+
+import sys
+import time
+import resource
+from array import array
+from typing import List, Tuple
+
+# Códigos de tipo (caben en un byte)
+TIPOS = ('int', 'float')
+CODIGO_TIPO = {tipo: i for i, tipo in enumerate(TIPOS)}
+
+# Nombre usado para símbolos declarados sin fichero registrado
+FICHERO_DESCONOCIDO = '<sin fichero>'
+
+# Clases de error semántico
+REDECLARACION = 0
+CONFLICTO_TIPO = 1
+
+
+class TablaSimbolos:
+    """Tabla identificador -> (tipo, primera línea, fichero) con almacenamiento compacto."""
+
+    def __init__(self):
+        self._indice = {}               # nombre -> posición
+        self._tipos = array('B')        # código de tipo por posición
+        self._lineas = array('L')       # línea de la primera declaración
+        self._ficheros = array('I')     # índice en self.ficheros
+        self.ficheros: List[str] = []
+        self._fichero_actual = 0
+        # (clase, nombre, código de tipo, línea, fichero) de cada error
+        self._errores: List[Tuple[int, str, int, int, int]] = []
+
+    def __len__(self):
+        return len(self._tipos)
+
+    def __contains__(self, nombre):
+        return nombre in self._indice
+
+    def nuevo_fichero(self, nombre: str) -> int:
+        """Registra un fichero y lo convierte en el actual para declarar()."""
+        self.ficheros.append(nombre)
+        self._fichero_actual = len(self.ficheros) - 1
+        return self._fichero_actual
+
+    def declarar(self, nombre: str, tipo: str, linea: int, fichero: int = None) -> bool:
+        """
+        Declara un identificador. Devuelve False (y anota el error) si ya
+        estaba declarado, con el mismo tipo o con otro distinto.
+        """
+        if fichero is None:
+            fichero = self._fichero_actual
+        codigo = CODIGO_TIPO[tipo]
+        posicion = self._indice.get(nombre)
+        if posicion is None:
+            self._indice[nombre] = len(self._tipos)
+            self._tipos.append(codigo)
+            self._lineas.append(linea)
+            self._ficheros.append(fichero)
+            return True
+
+        clase = REDECLARACION if self._tipos[posicion] == codigo else CONFLICTO_TIPO
+        self._errores.append((clase, nombre, codigo, linea, fichero))
+        return False
+
+    def buscar(self, nombre: str):
+        """Devuelve (tipo, línea, fichero) de un identificador o None."""
+        posicion = self._indice.get(nombre)
+        if posicion is None:
+            return None
+        return (TIPOS[self._tipos[posicion]], self._lineas[posicion],
+                self.ficheros[self._ficheros[posicion]] if self.ficheros else None)
+
+    def fusionar(self, otra: "TablaSimbolos"):
+        """
+        Añade los símbolos de otra tabla (otro fichero o fragmento).
+        Las declaraciones de 'otra' que choquen con las de esta tabla se
+        anotan como errores; también se heredan los errores propios de 'otra'.
+        """
+        # Si solo una de las dos tablas tiene ficheros registrados, la otra
+        # recibe uno genérico para que sus índices (0) no apunten a un fichero ajeno
+        if otra.ficheros:
+            if not self.ficheros and len(self):
+                self.ficheros.append(FICHERO_DESCONOCIDO)
+            remapeo = [len(self.ficheros) + i for i in range(len(otra.ficheros))]
+            self.ficheros.extend(otra.ficheros)
+        elif self.ficheros:
+            self.ficheros.append(FICHERO_DESCONOCIDO)
+            remapeo = [len(self.ficheros) - 1]
+        else:
+            remapeo = [0]
+        tipos, lineas, ficheros = otra._tipos, otra._lineas, otra._ficheros
+        for nombre, posicion in otra._indice.items():
+            self.declarar(nombre, TIPOS[tipos[posicion]], lineas[posicion],
+                          remapeo[ficheros[posicion]])
+        for clase, nombre, codigo, linea, fichero in otra._errores:
+            self._errores.append((clase, nombre, codigo, linea, remapeo[fichero]))
+
+    def _ubicacion(self, linea, fichero):
+        if self.ficheros:
+            return f"{self.ficheros[fichero]}:{linea}"
+        return f"línea {linea}"
+
+    @property
+    def n_errores(self) -> int:
+        return len(self._errores)
+
+    def errores(self) -> List[str]:
+        """Mensajes de los errores semánticos encontrados."""
+        mensajes = []
+        for clase, nombre, codigo, linea, fichero in self._errores:
+            tipo_previo, linea_previa, _ = self.buscar(nombre)
+            previa = self._ubicacion(linea_previa, self._ficheros[self._indice[nombre]])
+            if clase == REDECLARACION:
+                mensajes.append(f"Error Semántico ({self._ubicacion(linea, fichero)}): "
+                                f"'{nombre}' ya fue declarado como {tipo_previo} en {previa}")
+            else:
+                mensajes.append(f"Error Semántico ({self._ubicacion(linea, fichero)}): "
+                                f"conflicto de tipos, '{nombre}' declarado como {TIPOS[codigo]} "
+                                f"pero ya era {tipo_previo} en {previa}")
+        return mensajes
+
+    def memoria(self) -> int:
+        """
+        Estimación en bytes de la memoria usada: el dict, sus claves (nombres)
+        y sus valores (las posiciones son int de Python; a partir de 256 cada
+        una es un objeto propio) y los arrays de datos.
+        """
+        total = sys.getsizeof(self._indice)
+        total += sum(sys.getsizeof(nombre) for nombre in self._indice)
+        total += sum(sys.getsizeof(posicion) for posicion in self._indice.values() if posicion > 256)
+        for datos in (self._tipos, self._lineas, self._ficheros):
+            total += datos.itemsize * len(datos)
+        return total
+
+
+# Benchmark: memoria y tiempo con millones de identificadores
+
+def main(argv):
+    """
+    Uso: python tabla_simbolos.py [N_IDENTIFICADORES] [N_FRAGMENTOS]
+    Construye N_FRAGMENTOS tablas (como si fueran ficheros distintos),
+    las fusiona y mide tiempo y memoria. Después parsea un fichero de
+    ejemplo con el parser LL(1) para medir el análisis completo.
+    """
+    import parser as ll1
+
+    n = int(argv[1]) if len(argv) > 1 else 10_000_000
+    n_fragmentos = int(argv[2]) if len(argv) > 2 else 4
+    por_fragmento = n // n_fragmentos
+
+    inicio = time.perf_counter()
+    fragmentos = []
+    for f in range(n_fragmentos):
+        tabla = TablaSimbolos()
+        tabla.nuevo_fichero(f"fragmento{f}.c")
+        base = f * por_fragmento
+        for i in range(por_fragmento):
+            # Cada 1000 identificadores uno se repite en el fragmento siguiente
+            # con otro tipo, para que la fusión encuentre conflictos
+            j = base + i - 1 if i % 1000 == 0 and base else base + i
+            tabla.declarar(f"v{j}", TIPOS[f % 2], i // 10 + 1)
+        fragmentos.append(tabla)
+    t_construir = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    total = fragmentos[0]
+    for tabla in fragmentos[1:]:
+        total.fusionar(tabla)
+    t_fusionar = time.perf_counter() - inicio
+
+    print(f"Identificadores declarados: {n_fragmentos * por_fragmento:,} en {n_fragmentos} fragmentos")
+    print(f"Construcción: {t_construir:.2f} s | fusión: {t_fusionar:.2f} s")
+    print(f"Símbolos únicos: {len(total):,} | errores: {total.n_errores:,}")
+    print(f"Memoria de la tabla: {total.memoria() / 2**20:.1f} MB "
+          f"({total.memoria() / max(len(total), 1):.1f} bytes/símbolo)")
+    # Contraste con el sistema: pico de RSS del proceso (KB en Linux), que
+    # incluye también las tablas de los fragmentos antes de fusionarlas
+    print(f"Pico de RSS del proceso: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.1f} MB")
+    if total.n_errores:
+        print(f"Ejemplo: {total.errores()[0]}")
+
+    # Análisis completo (sintáctico + semántico) de un fichero generado
+    n_lineas = min(n // 10, 100_000)
+    texto = "".join(f"int a{i}, b{i}, c{i}, a{i - 1} ;\n" if i % 100 == 99 else
+                    f"float a{i}, b{i}, c{i} ;\n" for i in range(n_lineas))
+    tabla = TablaSimbolos()
+    tabla.nuevo_fichero("generado.c")
+    inicio = time.perf_counter()
+    errores_sintaxis = ll1.analizar_texto(texto, tabla)
+    t_parseo = time.perf_counter() - inicio
+    print(f"\nParseo + análisis semántico de {n_lineas:,} líneas: {t_parseo:.2f} s "
+          f"({len(tabla):,} símbolos, {tabla.n_errores} errores semánticos, "
+          f"{len(errores_sintaxis)} errores sintácticos)")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,8 +1,12 @@
 import sys
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 try:
-    from spanish_parser import analizar_oracion
-    from spacy_nlp_parser import analizar_spacy
+    from spanish_parser import analizar_oracion, Lexer, Parser
+    from spacy_nlp_parser import analizar_spacy, nlp
 except ImportError as e:
     print(f"Error: No se encontraron los archivos necesarios ({e}).")
     print("Asegúrate de ejecutar este script en la carpeta Fase2 junto con spanish_parser.py y spacy_nlp_parser.py")
@@ -23,18 +27,20 @@ def print_separator(title):
     print(f"{Color.HEADER}{Color.BOLD} {title} {Color.ENDC}")
     print("="*80)
 
+# Lista de cadenas de prueba estratégicas
+TEST_CASES = [
+    "la niña vende la nueva computadora",
+    "el inteligente estudiante estudia un viejo libro",
+    "el perro mira el rápido gato",
+    # Errores en el parser normal
+    "gato come libro",  # Falta artículos
+    "el humano lee libro",  # Humano no está en la gramática original
+    "Los gato un come coche",  # Errores de concordancia
+    "veo al hombre con el telescopio" # Ambiguedad
+]
+
 def run_comparison():
-    # Lista de cadenas de prueba estratégicas
-    test_cases = [
-        "la niña vende la nueva computadora",
-        "el inteligente estudiante estudia un viejo libro",
-        "el perro mira el rápido gato",
-        # Errores en el parser normal
-        "gato come libro",  # Falta artículos
-        "el humano lee libro",  # Humano no está en la gramática original
-        "Los gato un come coche",  # Errores de concordancia
-        "veo al hombre con el telescopio" # Ambiguedad
-    ]
+    test_cases = TEST_CASES
 
     print_separator("COMPARACIÓN EN TIEMPO REAL: PARSER FORMAL vs NLP (spaCy)")
     
@@ -65,5 +71,222 @@ def run_comparison():
         if i < len(test_cases):
             input(f"\n{Color.WARNING}Presiona ENTER para continuar...{Color.ENDC}")
 
+# --- Modo por lotes (no interactivo) ---
+
+def _analizar_formal(sentence):
+    """Parser formal sin salida por pantalla: devuelve el veredicto."""
+    parser = Parser(Lexer().tokenizar(sentence))
+    aceptada = parser.parsear()
+    return {
+        "aceptada": aceptada,
+        "errores": parser.errores,
+    }
+
+def _analizar_nlp(sentence):
+    """
+    spaCy sin salida por pantalla. Resume la forma del árbol de dependencias:
+    los hijos directos de la raíz en orden, y si es Sujeto-Verbo-Objeto.
+    """
+    doc = nlp(sentence)
+    raices = [t for t in doc if t.dep_ == "ROOT"]
+    forma = []
+    svo = False
+    if raices:
+        raiz = raices[0]
+        deps = [hijo.dep_ for hijo in raiz.children]
+        forma = [t.dep_ for t in sorted([raiz, *raiz.children], key=lambda t: t.i)]
+        svo = raiz.pos_ in ("VERB", "AUX") and "nsubj" in deps and ("obj" in deps or "dobj" in deps)
+    return {
+        "svo": svo,
+        "forma": " ".join(forma),
+    }
+
+def _cronometrado(analizador, sentence, enviado):
+    """Ejecuta el analizador y añade los tiempos (ms) desde que se envió la tarea."""
+    inicio = time.perf_counter()
+    resultado = analizador(sentence)
+    fin = time.perf_counter()
+    resultado["espera_ms"] = (inicio - enviado) * 1000
+    resultado["latencia_ms"] = (fin - enviado) * 1000
+    return resultado
+
+def _percentiles(valores):
+    if not valores:
+        return {"n": 0}
+    valores = sorted(valores)
+    def p(q):
+        return round(valores[min(len(valores) - 1, int(q * len(valores)))], 3)
+    return {"n": len(valores), "p50": p(0.50), "p90": p(0.90), "p99": p(0.99), "max": round(valores[-1], 3)}
+
+def run_batch_comparison(sentences, batch_size=32, deadline=2.0, workers=4, analizadores=None):
+    """
+    Ejecuta ambos analizadores en paralelo, por lotes de batch_size oraciones.
+    Cada analizador tiene su propio ejecutor ("carril"):
+      - formal: ThreadPoolExecutor con 'workers' hilos,
+      - nlp: un solo hilo, porque spaCy no garantiza que un mismo pipeline
+        se pueda llamar desde varios hilos a la vez.
+    En cada carril nunca hay más tareas en curso que hilos, así que una tarea
+    empieza nada más enviarse y su plazo ('deadline' segundos) cuenta desde
+    ese momento: no incluye esperas en cola ni detrás de otra oración lenta.
+    La latencia que se informa es de extremo a extremo (envío -> resultado).
+
+    Una tarea que supera su plazo se marca como 'timeout', pero un hilo no se
+    puede interrumpir: sigue ocupando su hilo hasta que termina, y mientras
+    tanto su carril no recibe tareas nuevas (las siguientes esperan sin que
+    corra su plazo). El informe se devuelve sin esperar a esas tareas
+    ('desbordadas' dice cuántas seguían en marcha).
+    'analizadores' permite sustituir las funciones de análisis
+    ({"formal": f, "nlp": g}), por ejemplo en comprobar_plazos().
+    Devuelve un informe en forma de dict (serializable a JSON).
+    """
+    analizadores = analizadores or {"formal": _analizar_formal, "nlp": _analizar_nlp}
+    carriles = {
+        "formal": (analizadores["formal"], ThreadPoolExecutor(max_workers=workers), workers),
+        "nlp": (analizadores["nlp"], ThreadPoolExecutor(max_workers=1), 1),
+    }
+    items = []
+    latencias = {nombre: [] for nombre in carriles}
+    timeouts = {nombre: 0 for nombre in carriles}
+    desbordadas = {nombre: set() for nombre in carriles}
+
+    try:
+        for inicio_lote in range(0, len(sentences), batch_size):
+            lote = [{"oracion": s} for s in sentences[inicio_lote:inicio_lote + batch_size]]
+            pendientes = {nombre: deque(lote) for nombre in carriles}
+            en_curso = {}  # futuro -> (item, carril, límite)
+
+            while any(pendientes.values()) or en_curso:
+                for nombre, (analizador, executor, capacidad) in carriles.items():
+                    desbordadas[nombre] = {f for f in desbordadas[nombre] if not f.done()}
+                    ocupados = len(desbordadas[nombre]) + sum(1 for _, n, _ in en_curso.values() if n == nombre)
+                    while pendientes[nombre] and ocupados < capacidad:
+                        item = pendientes[nombre].popleft()
+                        enviado = time.perf_counter()
+                        futuro = executor.submit(_cronometrado, analizador, item["oracion"], enviado)
+                        en_curso[futuro] = (item, nombre, enviado + deadline)
+                        ocupados += 1
+
+                # Esperar a que termine alguna tarea o venza el plazo más próximo
+                vencimiento = min((limite for _, _, limite in en_curso.values()), default=None)
+                espera = None if vencimiento is None else max(0.0, vencimiento - time.perf_counter())
+                esperando = set(en_curso).union(*desbordadas.values())
+                wait(esperando, timeout=espera, return_when=FIRST_COMPLETED)
+
+                ahora = time.perf_counter()
+                for futuro, (item, nombre, limite) in list(en_curso.items()):
+                    if futuro.done():
+                        del en_curso[futuro]
+                        try:
+                            resultado = futuro.result()
+                        except Exception as e:
+                            resultado = {"error": str(e)}
+                        if resultado.get("latencia_ms", 0) > deadline * 1000:
+                            timeouts[nombre] += 1
+                            resultado = {"timeout": True}
+                        elif "latencia_ms" in resultado:
+                            latencias[nombre].append(resultado["latencia_ms"])
+                        item[nombre] = resultado
+                    elif ahora >= limite:
+                        del en_curso[futuro]
+                        desbordadas[nombre].add(futuro)
+                        timeouts[nombre] += 1
+                        item[nombre] = {"timeout": True}
+
+            for item in lote:
+                if "aceptada" in item["formal"] and "svo" in item["nlp"]:
+                    item["coinciden"] = item["formal"]["aceptada"] == item["nlp"]["svo"]
+                items.append(item)
+    finally:
+        for _, executor, _ in carriles.values():
+            executor.shutdown(wait=False)
+
+    comparables = [it for it in items if "coinciden" in it]
+    return {
+        "total": len(items),
+        "comparables": len(comparables),
+        "coincidencias": sum(1 for it in comparables if it["coinciden"]),
+        "aceptadas_formal": sum(1 for it in comparables if it["formal"]["aceptada"]),
+        "svo_nlp": sum(1 for it in comparables if it["nlp"]["svo"]),
+        "timeouts": timeouts,
+        "desbordadas": sum(1 for fs in desbordadas.values() for f in fs if not f.done()),
+        "latencia_ms": {nombre: _percentiles(v) for nombre, v in latencias.items()},
+        "items": items,
+    }
+
+def comprobar_plazos():
+    """
+    Comprueba que una oración lenta no provoca timeouts en sus vecinas:
+    con analizadores simulados (50 ms, y 1,5 s las oraciones "lentas") y un
+    plazo de 0,5 s, solo deben vencer las lentas, y la latencia mediana del
+    carril nlp debe ser la del propio analizador.
+    """
+    def simulado(sentence):
+        time.sleep(1.5 if sentence.startswith("lenta") else 0.05)
+        return {"aceptada": True, "svo": True}
+
+    sentences = [f"lenta {i}" if i % 8 == 3 else f"normal {i}" for i in range(23)]
+    lentas = sum(1 for s in sentences if s.startswith("lenta"))
+    informe = run_batch_comparison(sentences, batch_size=32, deadline=0.5, workers=4,
+                                   analizadores={"formal": simulado, "nlp": simulado})
+    p50 = informe["latencia_ms"]["nlp"]["p50"]
+    correcto = informe["timeouts"] == {"formal": lentas, "nlp": lentas} and p50 < 100
+    color = Color.GREEN if correcto else Color.FAIL
+    print(f"{color}Plazos: {lentas} oraciones lentas -> timeouts {informe['timeouts']}, "
+          f"p50 nlp {p50} ms: {'OK' if correcto else 'FALLO'}{Color.ENDC}")
+    return correcto
+
+def main(argv):
+    """
+    Sin argumentos: demo interactiva (run_comparison).
+    --check: comprueba que los plazos por oración son independientes (comprobar_plazos).
+    Modo por lotes:
+      python demo.py --batch [FICHERO] [--batch-size N] [--deadline S] [--workers N] [--output INFORME.json]
+    """
+    if "--check" in argv[1:]:
+        sys.exit(0 if comprobar_plazos() else 1)
+
+    if "--batch" not in argv[1:]:
+        run_comparison()
+        return
+
+    opciones = {"--batch-size": 32, "--deadline": 2.0, "--workers": 4, "--output": None}
+    fichero = None
+    args = argv[1:]
+    try:
+        i = 0
+        while i < len(args):
+            if args[i] == "--batch":
+                if i + 1 < len(args) and not args[i + 1].startswith("--"):
+                    fichero = args[i + 1]
+                    i += 1
+            elif args[i] in opciones:
+                tipo = type(opciones[args[i]]) if opciones[args[i]] is not None else str
+                opciones[args[i]] = tipo(args[i + 1])
+                i += 1
+            else:
+                raise ValueError(f"opción desconocida '{args[i]}'")
+            i += 1
+    except (IndexError, ValueError) as e:
+        print(f"Argumentos inválidos: {e}")
+        print(main.__doc__)
+        return
+
+    if fichero:
+        with open(fichero, encoding="utf-8") as f:
+            sentences = [linea.strip() for linea in f if linea.strip()]
+    else:
+        sentences = TEST_CASES
+
+    informe = run_batch_comparison(sentences, opciones["--batch-size"],
+                                   opciones["--deadline"], opciones["--workers"])
+    salida = json.dumps(informe, ensure_ascii=False, indent=2)
+    if opciones["--output"]:
+        with open(opciones["--output"], "w", encoding="utf-8") as f:
+            f.write(salida)
+        print(f"{Color.GREEN}Informe guardado en {opciones['--output']}{Color.ENDC} "
+              f"({informe['coincidencias']}/{informe['comparables']} coincidencias)")
+    else:
+        print(salida)
+
 if __name__ == "__main__":
-    run_comparison()
\ No newline at end of file
+    main(sys.argv)
\ No newline at end of file
@@ -1,5 +1,11 @@
+import os
+import sys
 import spacy
 
+# El pre-divisor de textos largos es el de Fase1 (nlp_demo_spacy.split_text)
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "Fase1"))
+from nlp_demo_spacy import split_text
+
 # Cargar modelo de spaCy para español
 try:
     nlp = spacy.load("es_core_news_sm")
@@ -20,7 +26,70 @@ class Color:
     BOLD = '\033[1m'
 
 
+# Tamaño máximo (en caracteres) de cada fragmento en el modo documento
+MAX_CHARS_FRAGMENTO = 20_000
+# Fragmentos que se envían juntos a nlp.pipe()
+FRAGMENTOS_POR_LOTE = 4
+
+
+def fragmentos_spacy(texto, max_chars=MAX_CHARS_FRAGMENTO, batch_size=FRAGMENTOS_POR_LOTE):
+    """
+    Procesa el texto por fragmentos con nlp.pipe() y genera (offset, doc).
+    Solo hay batch_size fragmentos en memoria a la vez: el pico de memoria
+    no depende del tamaño del documento.
+    """
+    for doc, offset in nlp.pipe(((frag, off) for off, frag in split_text(texto, max_chars)),
+                                as_tuples=True, batch_size=batch_size):
+        yield offset, doc
+
+
+def analizar_spacy_documento(texto, max_chars=MAX_CHARS_FRAGMENTO, detalle=False):
+    """
+    Modo documento para textos largos: procesa por fragmentos y muestra
+    entidades y frases nominales con su posición [inicio:fin] en el texto
+    completo. Con detalle=True también muestra cada token.
+    Devuelve solo los recuentos (no se guardan los Doc).
+    """
+    n_tokens = 0
+    n_palabras = 0
+    n_fragmentos = 0
+    pos_counts = {}
+
+    print(f"\n{Color.CYAN}{Color.BOLD}Modo documento:{Color.ENDC} {len(texto)} caracteres")
+    for offset, doc in fragmentos_spacy(texto, max_chars):
+        n_fragmentos += 1
+        if detalle:
+            for token in doc:
+                inicio = offset + token.idx
+                print(f"  [{inicio}:{inicio + len(token)}] {token.text:15} → {token.pos_:10} ({token.tag_})")
+        for ent in doc.ents:
+            print(f"  {Color.GREEN}Entidad{Color.ENDC} [{offset + ent.start_char}:{offset + ent.end_char}] "
+                  f"{ent.text} → {ent.label_}")
+        try:
+            for chunk in doc.noun_chunks:
+                print(f"  {Color.GREEN}Frase nominal{Color.ENDC} "
+                      f"[{offset + chunk.start_char}:{offset + chunk.end_char}] {chunk.text}")
+        except ValueError:
+            # El modelo no tiene parser de dependencias
+            pass
+        for token in doc:
+            pos_counts[token.pos_] = pos_counts.get(token.pos_, 0) + 1
+            n_palabras += not token.is_punct
+        n_tokens += len(doc)
+
+    print(f"\n{Color.CYAN}{Color.BOLD}Análisis estadístico y recuento:{Color.ENDC}")
+    print(f"  {Color.GREEN}- Fragmentos procesados: {Color.ENDC}{n_fragmentos}")
+    print(f"  {Color.GREEN}- Número de tokens: {Color.ENDC}{n_tokens}")
+    print(f"  {Color.GREEN}- Número de palabras: {Color.ENDC}{n_palabras}")
+    print(f"  {Color.GREEN}- Recuento de categorías gramaticales:{Color.ENDC}")
+    for pos, count in pos_counts.items():
+        print(f"    - {pos}: {count}")
+
+    return {"fragmentos": n_fragmentos, "tokens": n_tokens, "palabras": n_palabras, "pos": pos_counts}
+
+
 def analizar_spacy(texto):
+    # Para textos largos (más de MAX_CHARS_FRAGMENTO) usar analizar_spacy_documento
     doc = nlp(texto)
     
     # Análisis morfológico
@@ -54,6 +123,12 @@ def analizar_spacy(texto):
 
 if __name__ == "__main__":
 
+    # python spacy_nlp_parser.py --doc FICHERO   (documento largo, por fragmentos)
+    if len(sys.argv) > 2 and sys.argv[1] == "--doc":
+        with open(sys.argv[2], encoding="utf-8") as f:
+            analizar_spacy_documento(f.read())
+        sys.exit(0)
+
     oraciones_prueba = [
         "la niña vende la nueva computadora",
         "el inteligente estudiante estudia un viejo libro",
@@ -0,0 +1,195 @@
+"""
+Aceptación por lotes de la gramática Art Adj* Sust Verbo Art Adj* Sust.
+
+Cada oración se convierte en una fila de códigos de categoría (y otra de
+rasgos morfológicos) dentro de matrices NumPy rellenas con PAD. El autómata
+avanza una columna cada vez para TODAS las oraciones a la vez:
+
+    estados = TRANSICIONES[estados, codigos[:, j]]
+
+La concordancia de género y número se comprueba igual que en Parser, con
+operaciones AND sobre las máscaras de rasgos. El resultado es una máscara de
+aceptación y la primera posición fallida de cada oración; el árbol completo
+solo se construye (con Parser) para las oraciones que lo necesiten.
+"""
+
+import sys
+import time
+
+import numpy as np
+
+from spanish_parser import (Lexer, Parser, _FORMAS, analizar_palabra,
+                            GENERO, NUMERO)
+
+# Códigos de categoría (0 es el relleno de fin de oración)
+PAD = 0
+ARTICULO = 1
+ADJETIVO = 2
+SUSTANTIVO = 3
+VERBO = 4
+DESCONOCIDO = 5
+
+CODIGOS = {
+    "ARTICULO": ARTICULO,
+    "ADJETIVO": ADJETIVO,
+    "SUSTANTIVO": SUSTANTIVO,
+    "VERBO": VERBO,
+    "DESCONOCIDO": DESCONOCIDO,
+}
+
+# Estados del autómata
+INICIO = 0        # esperando el artículo del sujeto
+SUJ_ART = 1       # sujeto: tras artículo/adjetivos
+SUJ_SUST = 2      # sujeto completo, esperando verbo
+VERBO_LEIDO = 3   # esperando el artículo del objeto
+OBJ_ART = 4       # objeto: tras artículo/adjetivos
+ACEPTA = 5        # oración completa
+MUERTO = 6
+
+TRANSICIONES = np.full((7, 6), MUERTO, dtype=np.int8)
+TRANSICIONES[INICIO, ARTICULO] = SUJ_ART
+TRANSICIONES[SUJ_ART, ADJETIVO] = SUJ_ART
+TRANSICIONES[SUJ_ART, SUSTANTIVO] = SUJ_SUST
+TRANSICIONES[SUJ_SUST, VERBO] = VERBO_LEIDO
+TRANSICIONES[VERBO_LEIDO, ARTICULO] = OBJ_ART
+TRANSICIONES[OBJ_ART, ADJETIVO] = OBJ_ART
+TRANSICIONES[OBJ_ART, SUSTANTIVO] = ACEPTA
+TRANSICIONES[ACEPTA, PAD] = ACEPTA
+
+
+class _CacheCodigos(dict):
+    """palabra -> (código << 4) | rasgos; las palabras nuevas se analizan una sola vez."""
+
+    def __missing__(self, palabra):
+        tipo, _, rasgos = _FORMAS.get(palabra) or analizar_palabra(palabra)
+        valor = self[palabra] = (CODIGOS[tipo] << 4) | rasgos
+        return valor
+
+
+def codificar(oraciones):
+    """
+    Convierte las oraciones en matrices (n, max_len + 1) de códigos y rasgos.
+    La columna extra garantiza que todas las filas terminan en PAD, que es
+    donde se comprueba que la oración no quedó a medias.
+    """
+    cache = _CacheCodigos()
+    plano = []
+    longitudes = []
+    for oracion in oraciones:
+        palabras = oracion.lower().split()
+        longitudes.append(len(palabras))
+        plano.extend(map(cache.__getitem__, palabras))
+
+    longitudes = np.array(longitudes, dtype=np.int64)
+    ancho = int(longitudes.max()) + 1 if len(longitudes) else 1
+    empaquetado = np.zeros((len(longitudes), ancho), dtype=np.int16)
+
+    # Relleno vectorizado: posiciones válidas de cada fila a partir de las longitudes
+    if len(longitudes):
+        valido = np.arange(ancho) < longitudes[:, None]
+        empaquetado[valido] = np.array(plano, dtype=np.int16)
+    codigos = (empaquetado >> 4).astype(np.int8)
+    rasgos = (empaquetado & 0xF).astype(np.int8)
+    return codigos, rasgos, longitudes
+
+
+def aceptar_lote(codigos, rasgos):
+    """
+    Recorre las columnas aplicando la tabla de transiciones a todo el lote.
+    Devuelve (aceptadas, primer_fallo): primer_fallo es -1 en las aceptadas
+    y en las demás la posición del token donde falló (o la longitud si la
+    oración terminó antes de tiempo).
+    """
+    n, ancho = codigos.shape
+    estados = np.full(n, INICIO, dtype=np.int8)
+    acumulado = np.zeros(n, dtype=np.int8)
+    primer_fallo = np.full(n, -1, dtype=np.int64)
+
+    for j in range(ancho):
+        c = codigos[:, j]
+        r = rasgos[:, j]
+        nuevos = TRANSICIONES[estados, c]
+
+        # Concordancia dentro del sintagma nominal (AND de rasgos)
+        en_sintagma = ((estados == SUJ_ART) | (estados == OBJ_ART)) & \
+                      ((c == ADJETIVO) | (c == SUSTANTIVO))
+        acumulado = np.where(en_sintagma, acumulado & r, acumulado)
+        malos = en_sintagma & (((acumulado & GENERO) == 0) | ((acumulado & NUMERO) == 0))
+
+        # Concordancia de número entre sujeto y verbo
+        verbo = (estados == SUJ_SUST) & (c == VERBO)
+        malos |= verbo & ((acumulado & r & NUMERO) == 0)
+
+        # Un artículo abre un sintagma nuevo
+        acumulado = np.where(c == ARTICULO, r, acumulado)
+
+        nuevos[malos] = MUERTO
+        recien_muertos = (nuevos == MUERTO) & (primer_fallo == -1)
+        primer_fallo[recien_muertos] = j
+        estados = nuevos
+
+    aceptadas = estados == ACEPTA
+    return aceptadas, primer_fallo
+
+
+def analizar_lote(oraciones):
+    """Codifica y evalúa un lote de oraciones. Devuelve (aceptadas, primer_fallo)."""
+    codigos, rasgos, _ = codificar(oraciones)
+    return aceptar_lote(codigos, rasgos)
+
+
+def construir_arboles(oraciones, indices):
+    """
+    Ejecuta el Parser completo solo en las oraciones indicadas
+    (por ejemplo, las aceptadas para obtener su árbol, o las rechazadas
+    para obtener los mensajes de error). Devuelve {indice: parser}.
+    """
+    lexer = Lexer()
+    resultado = {}
+    for i in indices:
+        parser = Parser(lexer.tokenizar(oraciones[i]))
+        parser.parsear()
+        resultado[int(i)] = parser
+    return resultado
+
+
+# Benchmark: lote vectorizado vs bucle de Parser por oración
+
+def _generar_corpus(n):
+    oraciones = [
+        "la niña vende la nueva computadora",
+        "el inteligente estudiante estudia un viejo libro",
+        "los gatos comen las nuevas mesas",
+        "gato come libro",
+        "el humano lee libro",
+        "Los gato un come coche",
+        "los perros mira el rápido gato",
+    ]
+    return [oraciones[i % len(oraciones)] for i in range(n)]
+
+
+def main(argv):
+    n = int(argv[1]) if len(argv) > 1 else 200_000
+    corpus = _generar_corpus(n)
+
+    inicio = time.perf_counter()
+    lexer = Lexer()
+    esperadas = [Parser(lexer.tokenizar(o)).parsear() for o in corpus]
+    t_bucle = time.perf_counter() - inicio
+    print(f"Parser por oración: {n} oraciones en {t_bucle:.2f} s ({n / t_bucle:,.0f} oraciones/s)")
+
+    inicio = time.perf_counter()
+    codigos, rasgos, _ = codificar(corpus)
+    t_codificar = time.perf_counter() - inicio
+    aceptadas, _ = aceptar_lote(codigos, rasgos)
+    t_lote = time.perf_counter() - inicio
+    print(f"Lote vectorizado:   {n} oraciones en {t_lote:.2f} s ({n / t_lote:,.0f} oraciones/s) "
+          f"[codificar {t_codificar:.2f} s + autómata {t_lote - t_codificar:.2f} s]")
+
+    coinciden = int((aceptadas == np.array(esperadas)).sum())
+    print(f"Aceleración: x{t_bucle / t_lote:.1f} | aceptadas: {int(aceptadas.sum())} | "
+          f"coinciden con Parser: {coinciden}/{n}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
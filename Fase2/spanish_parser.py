@@ -1,50 +1,168 @@
+from functools import lru_cache
+
+# Rasgos morfológicos codificados como bits de un entero:
+# comprobar la concordancia es un simple AND entre máscaras.
+MASC = 1
+FEM = 2
+SING = 4
+PLUR = 8
+GENERO = MASC | FEM
+NUMERO = SING | PLUR
+
+# Número máximo de formas distintas que se recuerdan en la caché de lemas
+TAM_CACHE_LEMAS = 4096
+
+
+def describir_rasgos(rasgos):
+    """Texto legible de una máscara de rasgos, ej: 'masc. plural'."""
+    partes = []
+    if rasgos & GENERO == MASC:
+        partes.append("masc.")
+    elif rasgos & GENERO == FEM:
+        partes.append("fem.")
+    if rasgos & NUMERO == SING:
+        partes.append("singular")
+    elif rasgos & NUMERO == PLUR:
+        partes.append("plural")
+    return " ".join(partes) or "sin rasgos"
+
+
 class Token:
-    def __init__(self, tipo, valor):
+    def __init__(self, tipo, valor, lema=None, rasgos=0):
         self.tipo = tipo
         self.valor = valor
+        self.lema = lema if lema is not None else valor
+        self.rasgos = rasgos
     
     def __repr__(self):
         return f"Token({self.tipo}, '{self.valor}')"
 
 
 class Lexer:    
-    def __init__(self):
-        # Vocabulario limitado
-        self.articulos = {"el", "la", "un", "una", "los", "las"}
-        self.sustantivos = {
-            "gato", "perro", "niño", "niña", "casa", "libro", 
-            "árbol", "coche", "mesa", "computadora", "teléfono",
-            "profesor", "estudiante", "amigo", "hermano"
-        }
-        self.verbos = {
-            "come", "bebe", "lee", "escribe", "mira", "compra",
-            "vende", "estudia", "enseña", "construye", "usa"
-        }
-        self.adjetivos = {
-            "grande", "pequeño", "rojo", "azul", "verde", "amarillo",
-            "hermoso", "feo", "nueva", "viejo", "rápido", "lento",
-            "inteligente", "feliz", "triste"
-        }
+    # Vocabulario limitado (formas base: singular, y masculino en los adjetivos
+    # salvo "nueva"; el resto de formas se obtienen con analizar_palabra)
+    articulos = {"el", "la", "un", "una", "los", "las"}
+    sustantivos = {
+        "gato", "perro", "niño", "niña", "casa", "libro", 
+        "árbol", "coche", "mesa", "computadora", "teléfono",
+        "profesor", "estudiante", "amigo", "hermano"
+    }
+    verbos = {
+        "come", "bebe", "lee", "escribe", "mira", "compra",
+        "vende", "estudia", "enseña", "construye", "usa"
+    }
+    adjetivos = {
+        "grande", "pequeño", "rojo", "azul", "verde", "amarillo",
+        "hermoso", "feo", "nueva", "viejo", "rápido", "lento",
+        "inteligente", "feliz", "triste"
+    }
+
+    # Rasgos de las palabras cerradas
+    rasgos_articulos = {
+        "el": MASC | SING, "la": FEM | SING,
+        "un": MASC | SING, "una": FEM | SING,
+        "los": MASC | PLUR, "las": FEM | PLUR,
+    }
+    genero_sustantivos = {
+        "gato": MASC, "perro": MASC, "niño": MASC, "niña": FEM,
+        "casa": FEM, "libro": MASC, "árbol": MASC, "coche": MASC,
+        "mesa": FEM, "computadora": FEM, "teléfono": MASC,
+        "profesor": MASC, "estudiante": MASC | FEM, "amigo": MASC,
+        "hermano": MASC
+    }
     
     def tokenizar(self, texto):
         palabras = texto.lower().strip().split()
         tokens = []
         
         for palabra in palabras:
-            if palabra in self.articulos:
-                tokens.append(Token("ARTICULO", palabra))
-            elif palabra in self.sustantivos:
-                tokens.append(Token("SUSTANTIVO", palabra))
-            elif palabra in self.verbos:
-                tokens.append(Token("VERBO", palabra))
-            elif palabra in self.adjetivos:
-                tokens.append(Token("ADJETIVO", palabra))
-            else:
-                tokens.append(Token("DESCONOCIDO", palabra))
+            # Las formas del vocabulario cuestan un único acceso a diccionario;
+            # el resto pasa por el lematizador (memorizado)
+            analisis = _FORMAS.get(palabra) or analizar_palabra(palabra)
+            tokens.append(Token(analisis[0], palabra, analisis[1], analisis[2]))
         
         return tokens
 
 
+def _genero_por_terminacion(forma):
+    """Género de un adjetivo según su terminación (-o masc., -a fem., resto ambos)."""
+    if forma.endswith("o"):
+        return MASC
+    if forma.endswith("a"):
+        return FEM
+    return GENERO
+
+
+def _analizar_forma_base(forma, numero):
+    """Busca una forma ya sin marca de número en el vocabulario de sustantivos y adjetivos."""
+    if forma in Lexer.sustantivos:
+        return ("SUSTANTIVO", forma, Lexer.genero_sustantivos[forma] | numero)
+    # Los adjetivos varían en género: se prueba también la terminación opuesta
+    candidatos = [forma]
+    if forma.endswith("a"):
+        candidatos.append(forma[:-1] + "o")
+    elif forma.endswith("o"):
+        candidatos.append(forma[:-1] + "a")
+    for candidato in candidatos:
+        if candidato in Lexer.adjetivos:
+            return ("ADJETIVO", candidato, _genero_por_terminacion(forma) | numero)
+    return None
+
+
+@lru_cache(maxsize=TAM_CACHE_LEMAS)
+def analizar_palabra(palabra):
+    """
+    Lematizador por reglas de sufijos.
+    Devuelve (tipo, lema, rasgos) de una forma en minúsculas:
+      - plurales: -ces -> -z, -es, -s
+      - variación de género en adjetivos: -o / -a
+      - tercera persona del plural de los verbos: -n
+    Está memorizado con una caché LRU acotada: cada forma repetida cuesta
+    una sola consulta.
+    """
+    if palabra in _FORMAS:
+        return _FORMAS[palabra]
+
+    # Verbos en plural (comen -> come)
+    if palabra.endswith("n") and palabra[:-1] in Lexer.verbos:
+        return ("VERBO", palabra[:-1], PLUR)
+
+    # Sustantivos y adjetivos: primero la propia forma (singular)
+    # y después las posibles formas plurales
+    candidatos = [(palabra, SING)]
+    if palabra.endswith("ces"):
+        candidatos.append((palabra[:-3] + "z", PLUR))
+    if palabra.endswith("es"):
+        candidatos.append((palabra[:-2], PLUR))
+    if palabra.endswith("s"):
+        candidatos.append((palabra[:-1], PLUR))
+
+    for forma, numero in candidatos:
+        analisis = _analizar_forma_base(forma, numero)
+        if analisis:
+            return analisis
+
+    return ("DESCONOCIDO", palabra, 0)
+
+
+def _construir_formas():
+    """Tabla forma -> (tipo, lema, rasgos) con las formas exactas del vocabulario."""
+    formas = {}
+    # El orden reproduce la prioridad original: artículo, sustantivo, verbo, adjetivo
+    for palabra in Lexer.adjetivos:
+        formas[palabra] = ("ADJETIVO", palabra, _genero_por_terminacion(palabra) | SING)
+    for palabra in Lexer.verbos:
+        formas[palabra] = ("VERBO", palabra, SING)
+    for palabra in Lexer.sustantivos:
+        formas[palabra] = ("SUSTANTIVO", palabra, Lexer.genero_sustantivos[palabra] | SING)
+    for palabra, rasgos in Lexer.rasgos_articulos.items():
+        formas[palabra] = ("ARTICULO", palabra, rasgos)
+    return formas
+
+
+_FORMAS = _construir_formas()
+
+
 class Parser:   
     def __init__(self, tokens):
         self.tokens = tokens
@@ -85,7 +203,16 @@ class Parser:
         # Parsear Verbo
         if not self.verificar_tipo("VERBO"):
             return None
-        verbo = {"tipo": "Verbo", "valor": self.token_actual().valor}
+        token_verbo = self.token_actual()
+        # Concordancia de número entre sujeto y verbo
+        if not (sujeto["rasgos"] & token_verbo.rasgos & NUMERO):
+            self.errores.append(
+                f"Falta de concordancia: el sujeto ({describir_rasgos(sujeto['rasgos'])}) "
+                f"no concuerda en número con el verbo '{token_verbo.valor}' "
+                f"({describir_rasgos(token_verbo.rasgos)})"
+            )
+            return None
+        verbo = {"tipo": "Verbo", "valor": token_verbo.valor}
         arbol["hijos"].append(verbo)
         self.avanzar()
         
@@ -104,13 +231,29 @@ class Parser:
         
         return arbol
     
+    def verificar_concordancia(self, nombre, rasgos, token):
+        """
+        Comprueba que el token concuerde en género y número con los rasgos
+        acumulados del sintagma (AND de máscaras de bits).
+        Devuelve los rasgos comunes, o None si no concuerdan.
+        """
+        comunes = rasgos & token.rasgos
+        if comunes & GENERO and comunes & NUMERO:
+            return comunes
+        self.errores.append(
+            f"Falta de concordancia en {nombre}: '{token.valor}' ({describir_rasgos(token.rasgos)}) "
+            f"no concuerda con lo anterior ({describir_rasgos(rasgos)})"
+        )
+        return None
+    
     def parsear_sintagma_nominal(self, nombre):
-        """Sintagma → Artículo Adjetivo* Sustantivo"""
+        """Sintagma → Artículo Adjetivo* Sustantivo (concordando en género y número)"""
         sintagma = {"tipo": nombre, "hijos": []}
         
         # Artículo (obligatorio)
         if not self.verificar_tipo("ARTICULO"):
             return None
+        rasgos = self.token_actual().rasgos
         sintagma["hijos"].append({
             "tipo": "Artículo", 
             "valor": self.token_actual().valor
@@ -119,6 +262,9 @@ class Parser:
         
         # Adjetivos (0 o más)
         while self.token_actual() and self.token_actual().tipo == "ADJETIVO":
+            rasgos = self.verificar_concordancia(nombre, rasgos, self.token_actual())
+            if rasgos is None:
+                return None
             sintagma["hijos"].append({
                 "tipo": "Adjetivo",
                 "valor": self.token_actual().valor
@@ -128,12 +274,16 @@ class Parser:
         # Sustantivo (obligatorio)
         if not self.verificar_tipo("SUSTANTIVO"):
             return None
+        rasgos = self.verificar_concordancia(nombre, rasgos, self.token_actual())
+        if rasgos is None:
+            return None
         sintagma["hijos"].append({
             "tipo": "Sustantivo",
             "valor": self.token_actual().valor
         })
         self.avanzar()
         
+        sintagma["rasgos"] = rasgos
         return sintagma
     
     def parsear(self):